@@ -0,0 +1,112 @@
+import queue
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from scheduler import Future
+
+# nhịp kiểm tra queue kết quả khi đang có bot suy nghĩ
+POLL_MS = 15
+# cho bot thêm chút thời gian sau hạn chót trước khi dùng nước dự phòng
+GRACE_MS = 50
+
+
+class Budget:
+    # hạn thời gian cho một nước đi; bot tự kiểm tra expired() để dừng sớm
+    def __init__(self, ms):
+        self.ms = ms
+        self.deadline = time.perf_counter() + ms / 1000
+        self.cancelled = threading.Event()
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.perf_counter())
+
+    def expired(self):
+        return self.cancelled.is_set() or time.perf_counter() >= self.deadline
+
+
+class AITask:
+    def __init__(self, task_id, snapshot, budget, fallback):
+        self.id = task_id
+        self.snapshot = snapshot
+        self.budget = budget
+        self.fallback = fallback
+        self.future = Future()
+
+    def cancel(self):
+        self.budget.cancelled.set()
+
+
+class AIWorkerPool:
+    # bot suy nghĩ trên thread nền với snapshot bất biến; kết quả về qua
+    # queue.Queue và được Tk poll bằng after() chỉ khi còn task đang chờ.
+    # Quá hạn (budget + GRACE_MS) thì dùng nước của fallback(snapshot) để
+    # lượt chơi không bao giờ bị treo vì bot.
+    def __init__(self, root, workers=2, budget_ms=500):
+        self.root = root
+        self.budget_ms = budget_ms
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='uno-ai')
+        self.results = queue.Queue()
+        self._pending = {}
+        self._next_id = 0
+        self._poll_id = None
+
+    def submit(self, decide, snapshot, fallback, budget_ms=None):
+        # decide(snapshot, budget) -> (card_id, color); trả về Future của nước đi
+        self._next_id += 1
+        task = AITask(self._next_id, snapshot, Budget(budget_ms or self.budget_ms), fallback)
+        self._pending[task.id] = task
+        self.executor.submit(self._run, task.id, decide, snapshot, task.budget)
+        if self._poll_id is None:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
+        return task.future
+
+    def _run(self, task_id, decide, snapshot, budget):
+        # chạy trên worker thread: không được chạm vào Tk hay engine
+        if budget.cancelled.is_set():
+            return
+        try:
+            self.results.put((task_id, decide(snapshot, budget), None))
+        except Exception as ex:
+            self.results.put((task_id, None, ex))
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                task_id, move, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            task = self._pending.pop(task_id, None)
+            # task đã bị huỷ hoặc đã dùng nước dự phòng
+            if task is None:
+                continue
+            if error is not None:
+                # bug của bot: in đủ traceback ra stderr rồi đi nước dự phòng
+                print('AI error:', file=sys.stderr)
+                traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+                move = task.fallback(task.snapshot)
+            task.future.set_result(move)
+        now = time.perf_counter()
+        for task in list(self._pending.values()):
+            if now >= task.budget.deadline + GRACE_MS / 1000:
+                del self._pending[task.id]
+                task.cancel()
+                task.future.set_result(task.fallback(task.snapshot))
+        if self._pending:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
+
+    def cancel_all(self):
+        # huỷ mọi task (vd. khi ván mới bắt đầu); Future của chúng không bao giờ xong
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,163 @@
+import numpy as np
+
+from game import (COLORS, SPECIALS, ALL_VALUES, KINDS, CARD_KIND, NUM_STATES,
+                  PLAYABLE_KINDS, KIND_BITS)
+
+# bảng tra dạng mảng cho chế độ batch: mọi thứ theo loại lá (54 loại)
+NUM_KINDS = len(KINDS)
+KIND_COLOR = np.array([COLORS.index(c) if c else len(COLORS) for c, _ in KINDS], dtype=np.int8)
+KIND_VALUE = np.array([ALL_VALUES.index(v) for _, v in KINDS], dtype=np.int8)
+KIND_WILD = np.array([v in SPECIALS for _, v in KINDS])
+LEGAL = np.array([[(PLAYABLE_KINDS[s] >> (KIND_BITS * k)) & 1 for k in range(NUM_KINDS)]
+                  for s in range(NUM_STATES)], dtype=bool)
+DECK_KINDS = np.array(CARD_KIND, dtype=np.int8)
+SKIP = ALL_VALUES.index('Skip')
+REVERSE = ALL_VALUES.index('Reverse')
+DRAW_TWO = ALL_VALUES.index('Draw Two')
+DRAW_FOUR = ALL_VALUES.index('Wild Draw Four')
+
+
+class BatchEngine:
+    # B ván chạy song song dưới dạng mảng NumPy, mỗi step là một lượt của mọi
+    # ván chưa kết thúc. Luật giống GameEngine.ai_turn: đánh lá hợp lệ (loại có
+    # chỉ số nhỏ nhất thay cho "lá đầu tiên trên tay"), không có thì rút 1 lá
+    # và đánh luôn nếu được; bot luôn hô UNO nên không có phạt.
+    def __init__(self, games, num_players=4, hand_size=7, seed=None):
+        self.games = games
+        self.num_players = num_players
+        self.rng = np.random.default_rng(seed)
+        B, P = games, num_players
+
+        decks = self.rng.permuted(np.broadcast_to(DECK_KINDS, (B, len(DECK_KINDS))), axis=1)
+        self.deck = np.ascontiguousarray(decks)
+        self.deck_len = np.full(B, len(DECK_KINDS), dtype=np.int16)
+        self.hands = np.zeros((B, P, NUM_KINDS), dtype=np.int8)
+        self.sizes = np.zeros((B, P), dtype=np.int16)
+        rows = np.arange(B)
+        for p in range(P):
+            for _ in range(hand_size):
+                self.deck_len -= 1
+                self.hands[rows, p, self.deck[rows, self.deck_len]] += 1
+            self.sizes[:, p] = hand_size
+        self.deck_len -= 1
+        self.top_kind = self.deck[rows, self.deck_len].astype(np.int16)
+        self.top_color = KIND_COLOR[self.top_kind].astype(np.int16)
+        # lá nằm dưới lá trên cùng, chỉ cần số lượng vì sẽ bị trộn lại
+        self.discard = np.zeros((B, NUM_KINDS), dtype=np.int16)
+        self.direction = np.ones(B, dtype=np.int8)
+        self.current = np.zeros(B, dtype=np.int16)
+        self.done = np.zeros(B, dtype=bool)
+        self.winner = np.full(B, -1, dtype=np.int16)
+        self.turns = np.zeros(B, dtype=np.int32)
+        self.cards_drawn = np.zeros((B, P), dtype=np.int32)
+        self.reshuffles = np.zeros((B, P), dtype=np.int32)
+
+    def _reshuffle(self, g, seat):
+        counts = self.discard[g]
+        n = int(counts.sum())
+        if n == 0:
+            return
+        cards = np.repeat(np.arange(NUM_KINDS, dtype=np.int8), counts)
+        self.rng.shuffle(cards)
+        self.deck[g, :n] = cards
+        self.deck_len[g] = n
+        counts[:] = 0
+        self.reshuffles[g, seat] += 1
+
+    def _draw(self, g, seat):
+        # mỗi ván trong g rút 1 lá; trả về loại lá, -1 nếu không còn bài
+        empty = self.deck_len[g] == 0
+        for gi, si in zip(g[empty], seat[empty]):
+            self._reshuffle(gi, si)
+        ok = self.deck_len[g] > 0
+        kinds = np.full(len(g), -1, dtype=np.int16)
+        gi = g[ok]
+        self.deck_len[gi] -= 1
+        kinds[ok] = self.deck[gi, self.deck_len[gi]]
+        self.cards_drawn[gi, seat[ok]] += 1
+        return kinds
+
+    def _give(self, g, seat, count):
+        for _ in range(count):
+            kinds = self._draw(g, seat)
+            ok = kinds >= 0
+            self.hands[g[ok], seat[ok], kinds[ok]] += 1
+            self.sizes[g[ok], seat[ok]] += 1
+
+    def legal_mask(self, g=None):
+        # (len(g), 54): loại lá nào người hiện tại đánh được
+        if g is None:
+            g = np.arange(self.games)
+        state = self.top_color[g] * len(ALL_VALUES) + KIND_VALUE[self.top_kind[g]]
+        return LEGAL[state] & (self.hands[g, self.current[g]] > 0)
+
+    def step(self):
+        g = np.flatnonzero(~self.done)
+        if len(g) == 0:
+            return 0
+        P = self.num_players
+        cur = self.current[g]
+        legal = self.legal_mask(g)
+        has = legal.any(axis=1)
+        kind = np.where(has, legal.argmax(axis=1), -1).astype(np.int16)
+        from_hand = g[has]
+        self.hands[from_hand, cur[has], kind[has]] -= 1
+        self.sizes[from_hand, cur[has]] -= 1
+
+        # không có lá hợp lệ: rút 1 lá, đánh luôn nếu được, nếu không giữ lại
+        need = ~has
+        if need.any():
+            gd = g[need]
+            drawn = self._draw(gd, cur[need])
+            state = self.top_color[gd] * len(ALL_VALUES) + KIND_VALUE[self.top_kind[gd]]
+            ok = drawn >= 0
+            playable = np.zeros(len(gd), dtype=bool)
+            playable[ok] = LEGAL[state[ok], drawn[ok]]
+            keep = ok & ~playable
+            self.hands[gd[keep], cur[need][keep], drawn[keep]] += 1
+            self.sizes[gd[keep], cur[need][keep]] += 1
+            kind[need] = np.where(playable, drawn, -1)
+
+        played = kind >= 0
+        gp = g[played]
+        kp = kind[played]
+        self.discard[gp, self.top_kind[gp]] += 1
+        self.top_kind[gp] = kp
+        colors = KIND_COLOR[kp].astype(np.int16)
+        wild = KIND_WILD[kp]
+        colors[wild] = self.rng.integers(0, len(COLORS), int(wild.sum()))
+        self.top_color[gp] = colors
+
+        # hiệu ứng lá: giống GameEngine.apply_card
+        value = np.full(len(g), -1, dtype=np.int16)
+        value[played] = KIND_VALUE[kp]
+        reverse = value == REVERSE
+        self.direction[g[reverse]] *= -1
+        direction = self.direction[g].astype(np.int16)
+        step = np.ones(len(g), dtype=np.int16)
+        step[(value == SKIP) | (value == DRAW_TWO) | (value == DRAW_FOUR)] = 2
+        for v, count in ((DRAW_TWO, 2), (DRAW_FOUR, 4)):
+            hit = value == v
+            if hit.any():
+                victim = (cur[hit] + direction[hit]) % P
+                self._give(g[hit], victim, count)
+
+        won = self.sizes[g, cur] == 0
+        self.done[g[won]] = True
+        self.winner[g[won]] = cur[won]
+        self.current[g] = (cur + direction * step) % P
+        self.turns[g] += 1
+        return len(g)
+
+    def run(self, max_turns=5000):
+        for _ in range(max_turns):
+            if not self.step():
+                break
+        return self.winner
+
+    def results(self):
+        # cùng dạng với simulate.play_one để gộp vào SimStats
+        for b in range(self.games):
+            winner = int(self.winner[b])
+            yield (winner if winner >= 0 else None, int(self.turns[b]),
+                   self.cards_drawn[b].tolist(), self.reshuffles[b].tolist())
@@ -0,0 +1,272 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from game import GameEngine, Player, Deck, Card, DECK_LAYOUT, split_seed
+
+# chạy: python bench.py            -> ghi bench_results.json, so với bench_baseline.json
+#       python bench.py --save-baseline   -> cập nhật baseline (commit file này)
+BASELINE = 'bench_baseline.json'
+RESULTS = 'bench_results.json'
+
+
+def measure(run, min_time, repeat=5):
+    # run() làm một mẻ việc và trả về số thao tác; lấy tốc độ tốt nhất trong repeat lần đo
+    best = 0.0
+    for _ in range(repeat):
+        ops = 0
+        t0 = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            ops += run()
+            elapsed = time.perf_counter() - t0
+        best = max(best, ops / elapsed)
+    return best
+
+
+def bench_engine(min_time):
+    # mỗi mẻ luôn là cùng 50 ván để tốc độ không phụ thuộc độ dài ván ngẫu nhiên
+    def run():
+        for i in range(50):
+            engine = GameEngine([f'Bot {i+1}' for i in range(4)], seed=split_seed(0, i))
+            engine.play_game()
+        return 50
+    return {'engine_games': (measure(run, min_time), 'games/s')}
+
+
+def bench_play(min_time):
+    # Player.play trên tay 7 lá ngẫu nhiên với lá trên cùng ngẫu nhiên; lá đánh ra được trả lại tay
+    rng = random.Random(1)
+    cards = [Card(color, value, cid) for cid, (color, value) in enumerate(DECK_LAYOUT)]
+    cases = []
+    for _ in range(1000):
+        player = Player('Bot')
+        player.hand = rng.sample(cards, 7)
+        cases.append((player, rng.choice(cards)))
+
+    def run():
+        for player, top in cases:
+            card = player.play(top)
+            if card is not None:
+                player.hand.append(card)
+        return len(cases)
+    return {'player_play': (measure(run, min_time), 'plays/s')}
+
+
+def bench_deck(min_time):
+    deck = Deck(random.Random(2))
+
+    def draw_add():
+        for _ in range(1000):
+            deck.add(deck.draw())
+        return 1000
+
+    def refill():
+        # trộn lại chồng huỷ 60 lá rồi rút hết ra để lần sau dùng lại
+        pile = [deck.draw() for _ in range(61)]
+        deck.refill(pile, 60)
+        deck.add(pile[0])
+        return 1
+    return {'deck_draw_add': (measure(draw_add, min_time), 'ops/s'),
+            'deck_refill_60': (measure(refill, min_time), 'ops/s')}
+
+
+def bench_ismcts(min_time):
+    from bots import search
+    engine = GameEngine([f'Bot {i+1}' for i in range(4)], seed=5)
+    for _ in range(4):
+        engine.step()
+    snapshot = engine.snapshot()
+    rng = random.Random(3)
+
+    def run():
+        search(snapshot, lambda: False, rng, max_iterations=100)
+        return 100
+    return {'ismcts_iterations': (measure(run, min_time), 'iter/s')}
+
+
+def bench_state(min_time):
+    # GameState: copy + một nước đi (gồm cập nhật hash Zobrist)
+    from state import GameState
+    state = GameState.from_engine(GameEngine([f'Bot {i+1}' for i in range(4)], seed=5))
+    move = state.legal_moves()[0]
+    rng = random.Random(4)
+
+    def apply():
+        for _ in range(1000):
+            state.apply(move, rng)
+        return 1000
+    return {'state_apply': (measure(apply, min_time), 'ops/s')}
+
+
+class CountingCanvas:
+    # thay tk.Canvas khi không có display: không vẽ gì, chỉ đếm số lệnh gửi sang Tk
+    def __init__(self, master=None, **kw):
+        self.calls = 0
+        self._next_id = 0
+
+    def winfo_width(self):
+        return 900
+
+    def winfo_height(self):
+        return 700
+
+    def _call(self, *args, **kw):
+        self.calls += 1
+        self._next_id += 1
+        return self._next_id
+
+    def __getattr__(self, name):
+        return self._call
+
+
+class CountingImage:
+    def __init__(self, master=None, width=0, height=0, **kw):
+        self._size = (width, height)
+
+    def put(self, data, to=None):
+        pass
+
+    def width(self):
+        return self._size[0]
+
+    def height(self):
+        return self._size[1]
+
+
+class IdleRoot:
+    # root giả: after() không bao giờ chạy, để lượt chơi đứng yên trong lúc đo
+    def _call(self, *args, **kw):
+        return 'after#0'
+
+    def __getattr__(self, name):
+        return self._call
+
+
+def make_app():
+    # ưu tiên Tk thật (cửa sổ ẩn); không có display thì dùng canvas đếm lệnh
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+        root.withdraw()
+        backend = 'tk'
+    except tk.TclError:
+        tk.Canvas = CountingCanvas
+        tk.PhotoImage = CountingImage
+        root = IdleRoot()
+        backend = 'fake'
+    from gui import UnoGUI
+    app = UnoGUI(root, ['You', 'Bot 2', 'Bot 3', 'Bot 4'], seed=7)
+    app.turn_task.cancel()
+    app._canvas_size = (900, 700)
+    return app, backend
+
+
+def bench_draw_table(min_time):
+    app, backend = make_app()
+
+    def full():
+        # dựng lại toàn bộ như lần vẽ đầu tiên
+        app.canvas.delete('all')
+        app._layer_items = {}
+        app._layout_size = None
+        app._background_size = None
+        app.draw_table()
+        return 1
+
+    def noop():
+        app.draw_table()
+        return 1
+
+    sizes = iter([(900, 700), (1000, 760)] * 10**6)
+
+    def resize():
+        app._canvas_size = next(sizes)
+        app.draw_table()
+        return 1
+
+    results = {'draw_table_full': (measure(full, min_time), 'draws/s'),
+               'draw_table_noop': (measure(noop, min_time), 'draws/s'),
+               'draw_table_resize': (measure(resize, min_time), 'draws/s')}
+    if backend == 'fake':
+        # số lệnh canvas mỗi lần vẽ, không phụ thuộc tốc độ máy
+        for name, run in (('full', full), ('noop', noop), ('resize', resize)):
+            before = app.canvas.calls
+            run()
+            results[f'draw_table_{name}_calls'] = (app.canvas.calls - before, 'calls')
+    app.ai_pool.shutdown()
+    return results, backend
+
+
+def run_all(min_time):
+    metrics = {}
+    for bench in (bench_engine, bench_play, bench_deck, bench_state, bench_ismcts):
+        metrics.update(bench(min_time))
+    draw, backend = bench_draw_table(min_time)
+    metrics.update(draw)
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'canvas': backend,
+        'metrics': {name: {'value': value, 'unit': unit} for name, (value, unit) in metrics.items()},
+    }
+
+
+def compare(results, baseline, threshold):
+    # tốc độ (x/s): thấp hơn baseline quá threshold là chậm đi; số lệnh canvas: nhiều hơn là tệ đi
+    regressions = []
+    print(f"{'metric':<26}{'baseline':>14}{'current':>14}{'change':>9}")
+    for name, cur in results['metrics'].items():
+        base = baseline['metrics'].get(name)
+        if base is None:
+            print(f'{name:<26}{"-":>14}{cur["value"]:>14.1f}')
+            continue
+        if name.startswith('draw_table') and results['canvas'] != baseline.get('canvas'):
+            continue
+        if cur['unit'] == 'calls':
+            ratio = (base['value'] + 1) / (cur['value'] + 1)
+        else:
+            ratio = cur['value'] / base['value']
+        flag = ''
+        if ratio < 1 - threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f'{name:<26}{base["value"]:>14.1f}{cur["value"]:>14.1f}{(ratio - 1) * 100:>8.1f}%{flag}')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='UNO benchmarks')
+    parser.add_argument('--min-time', type=float, default=0.5, help='giây tối thiểu cho mỗi lần đo')
+    parser.add_argument('--out', default=RESULTS)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='ghi kết quả làm baseline mới')
+    parser.add_argument('--threshold', type=float, default=0.3, help='tỉ lệ chậm đi tối đa cho phép')
+    args = parser.parse_args(argv)
+
+    results = run_all(args.min_time)
+    path = args.baseline if args.save_baseline else args.out
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f'wrote {path}')
+    if args.save_baseline:
+        return 0
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f'no baseline at {args.baseline}; run with --save-baseline')
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print('regressions: ' + ', '.join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game import Player, Hand, COLORS, ALL_VALUES, DECK_LAYOUT, KINDS, CARD_KIND, split_seed, first_legal_move
+from state import GameState
+
+# hằng số khám phá của UCB
+EXPLORATION = 0.7
+# rollout dừng sau chừng này lượt (ván quá dài coi như không ai thắng)
+ROLLOUT_TURNS = 400
+
+
+# nước đi trong cây theo loại lá: (kind, color), kind None = rút 1 lá,
+# color chỉ có với lá wild (GameState.legal_moves). Khoá con trong cây là
+# (ghế đi, nước đi) vì sau một lần rút, người đi kế tiếp phụ thuộc lá rút được.
+def snapshot_moves(snapshot):
+    hand = Hand()
+    for cid in snapshot.hand:
+        hand.add(CARD_KIND[cid])
+    moves = set()
+    for kind in hand.playable(snapshot.top_state):
+        if KINDS[kind][0] is None:
+            moves.update((kind, color) for color in COLORS)
+        else:
+            moves.add((kind, None))
+    return moves or {(None, None)}
+
+
+def first_legal_kind(snapshot):
+    cid = first_legal_move(snapshot)[0]
+    return (None, None) if cid is None else (CARD_KIND[cid], None if DECK_LAYOUT[cid][0] else COLORS[0])
+
+
+class Node:
+    __slots__ = ('key', 'parent', 'children', 'visits', 'wins', 'avails')
+
+    def __init__(self, key=None, parent=None):
+        self.key = key
+        self.parent = parent
+        self.children = {}
+        self.visits = 0
+        self.wins = 0.0
+        self.avails = 1
+
+    def select(self, keys):
+        # UCB theo số lần nước đi "có mặt" (avails) thay cho số lần thăm cha
+        best, best_score = None, -1.0
+        for key in keys:
+            child = self.children[key]
+            score = child.wins / child.visits + EXPLORATION * math.sqrt(math.log(child.avails) / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        for key in keys:
+            self.children[key].avails += 1
+        return best
+
+
+def search(snapshot, stop, rng, root=None, max_iterations=None):
+    # single-observer ISMCTS: mỗi vòng lặp một determinization, đi xuống cây chỉ
+    # qua các nước hợp lệ trong determinization đó, rollout bằng bot đơn giản.
+    # Dùng GameState (state.py) thay cho GameEngine: copy/đi một nước chỉ vài µs
+    root = root or Node()
+    iterations = 0
+    while not stop() and iterations != max_iterations:
+        iterations += 1
+        state = GameState.determinize(snapshot, rng)
+        node = root
+        while state.winner < 0:
+            seat = state.current
+            keys = [(seat, move) for move in state.legal_moves()]
+            untried = [key for key in keys if key not in node.children]
+            if untried:
+                key = rng.choice(untried)
+                state = state.apply(key[1], rng)
+                node.children[key] = node = Node(key, node)
+                break
+            node = node.select(keys)
+            state = state.apply(node.key[1], rng)
+        winner = state.rollout(rng, ROLLOUT_TURNS)
+        root.visits += 1
+        while node is not root:
+            node.visits += 1
+            if node.key[0] == winner:
+                node.wins += 1
+            node = node.parent
+    return root
+
+
+def root_stats(root):
+    return {key[1]: (child.visits, child.wins) for key, child in root.children.items()}
+
+
+def search_stats(snapshot, ms, seed):
+    # chạy trong process phụ: một cây riêng, chỉ trả về thống kê nút gốc
+    deadline = time.perf_counter() + ms / 1000
+    root = search(snapshot, lambda: time.perf_counter() >= deadline, random.Random(seed))
+    return root_stats(root)
+
+
+class ISMCTSBot(Player):
+    # bot Monte-Carlo trên tập thông tin: suy nghĩ trong think_ms (hoặc ít hơn nếu
+    # Budget của AIWorkerPool sắp hết), giữ lại cây con giữa các lượt của mình.
+    # workers > 1: thêm workers-1 process tìm kiếm song song từ gốc, gộp số lần thăm
+    def __init__(self, name, think_ms=400, workers=1, seed=None, max_iterations=None):
+        super().__init__(name)
+        self.think_ms = think_ms
+        self.workers = workers
+        self.max_iterations = max_iterations
+        self.rng = random.Random(seed)
+        self._pool = None
+        self._tree = None
+        self._last = None
+        self._last_move = None
+
+    def decide(self, snapshot, budget=None):
+        # max_iterations (tournament.py): chạy đủ số vòng lặp, chỉ Budget mới cắt ngang
+        ms = self.think_ms if self.max_iterations is None else math.inf
+        if budget is not None:
+            ms = min(ms, budget.remaining() * 1000 - 20)
+        deadline = time.perf_counter() + max(ms, 1) / 1000
+
+        def stop():
+            return time.perf_counter() >= deadline or (budget is not None and budget.cancelled.is_set())
+
+        root = self._advance(snapshot)
+        extra = []
+        if self.workers > 1 and self.max_iterations is None:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers - 1)
+            base = self.rng.getrandbits(64)
+            extra = [self._pool.submit(search_stats, snapshot, max(ms, 1), split_seed(base, i))
+                     for i in range(self.workers - 1)]
+        root = search(snapshot, stop, self.rng, root, self.max_iterations)
+        stats = root_stats(root)
+        for fut in extra:
+            for move, (visits, wins) in fut.result().items():
+                v, w = stats.get(move, (0, 0.0))
+                stats[move] = (v + visits, w + wins)
+        # cây dùng lại có thể chứa nước không còn hợp lệ ở tình huống thật
+        legal = snapshot_moves(snapshot)
+        candidates = [m for m in stats if m in legal]
+        move = max(candidates, key=lambda m: stats[m][0]) if candidates else first_legal_kind(snapshot)
+        self._tree, self._last, self._last_move = root, snapshot, move
+        kind, color = move
+        if kind is None:
+            return None, None
+        return next(cid for cid in snapshot.hand if CARD_KIND[cid] == kind), color
+
+    def _advance(self, snapshot):
+        # tìm lại nút ứng với tình huống hiện tại trong cây của lượt trước. Mỗi lượt
+        # từ đó tới giờ là đánh một lá (thấy trong chồng huỷ) hoặc rút bài; dò các
+        # cách khớp có thể (ai rút, màu của wild chưa biết), không khớp thì cây mới
+        last = self._last
+        if last is None or snapshot.discard[:len(last.discard)] != last.discard:
+            return None
+        played = snapshot.discard[len(last.discard):]
+        n = len(snapshot.hand_sizes)
+        top_color = snapshot.top_state // len(ALL_VALUES)
+
+        def moves_for(i):
+            color, value = DECK_LAYOUT[played[i]]
+            kind = CARD_KIND[played[i]]
+            if color is not None:
+                return [(kind, None)]
+            if i == len(played) - 1 and top_color < len(COLORS):
+                return [(kind, COLORS[top_color])]
+            return [(kind, c) for c in COLORS]
+
+        def walk(node, seat, direction, i, turns):
+            if turns == 0:
+                return node if i == len(played) and seat == snapshot.seat else None
+            if len(played) - i > turns:
+                return None
+            # (nước đi, có đặt lá played[i] không); rút rồi đánh luôn cũng là nước rút
+            options = [((None, None), False)]
+            if i < len(played):
+                options += [(move, True) for move in moves_for(i)] + [((None, None), True)]
+            if node is self._tree:
+                options = [opt for opt in options if opt[0] == self._last_move]
+            for move, places in options:
+                child = node.children.get((seat, move))
+                if child is None:
+                    continue
+                d, step = direction, 1
+                if places:
+                    value = DECK_LAYOUT[played[i]][1]
+                    if value == 'Reverse':
+                        d = -d
+                    elif value in ('Skip', 'Draw Two', 'Wild Draw Four'):
+                        step = 2
+                found = walk(child, (seat + d * step) % n, d, i + places, turns - 1)
+                if found is not None:
+                    return found
+            return None
+
+        node = walk(self._tree, last.seat, last.direction, 0, snapshot.turns - last.turns)
+        if node is not None:
+            node.parent = None
+        return node
+
+    def choose_color(self, rng):
+        # màu nhiều nhất trên tay (dùng khi rút được wild và đánh luôn)
+        counts = {color: 0 for color in COLORS}
+        for card in self.hand:
+            if card.color is not None:
+                counts[card.color] += 1
+        best = max(counts.values())
+        return rng.choice([color for color in COLORS if counts[color] == best])
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,155 @@
+import json
+import queue
+import socket
+import threading
+
+from game import Player, Card, COLORS, DECK_LAYOUT, is_playable
+
+# nhịp Tk kiểm tra queue delta từ server
+POLL_MS = 15
+
+
+def open_socket(address):
+    # 'unix:/đường/dẫn' hoặc 'host:port'
+    if address.startswith('unix:'):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(address[len('unix:'):])
+        return sock
+    host, _, port = address.rpartition(':')
+    return socket.create_connection((host or '127.0.0.1', int(port)))
+
+
+class DeckView:
+    def __init__(self):
+        self.n = 0
+
+    def count(self):
+        return self.n
+
+
+class TableView:
+    # bản sao phía client của bàn chơi, dựng lại từ các delta của server
+    # (server.table_view); có đủ các thuộc tính GameEngine mà UnoGUI đọc.
+    # Bài của người khác chỉ biết số lá (None giữ chỗ)
+    def __init__(self):
+        self.seat = 0
+        self.players = []
+        self.deck = DeckView()
+        self.discard_pile = []
+        self.current = 0
+        self.direction = 1
+        self.winner = None
+        self.human_uno_called = False
+        self.pending_uno_penalty_index = None
+
+    def apply(self, delta):
+        if 'seat' in delta:
+            self.seat = delta['seat']
+        if 'names' in delta:
+            old = self.players
+            self.players = [Player(name, is_human=i == self.seat) for i, name in enumerate(delta['names'])]
+            for player, prev in zip(self.players, old):
+                player.hand = prev.hand
+        if 'hand' in delta:
+            self.players[self.seat].hand = [Card(*DECK_LAYOUT[cid], cid) for cid in delta['hand']]
+        if 'sizes' in delta:
+            for i, size in enumerate(delta['sizes']):
+                if i != self.seat:
+                    self.players[i].hand = [None] * size
+        if 'top' in delta:
+            cid, color = delta['top']
+            card = Card(*DECK_LAYOUT[cid], cid)
+            if color < len(COLORS):
+                card.color = COLORS[color]
+            self.discard_pile = [card]
+        if 'deck' in delta:
+            self.deck.n = delta['deck']
+        if 'cur' in delta:
+            self.current = delta['cur']
+        if 'dir' in delta:
+            self.direction = delta['dir']
+        if 'uno' in delta:
+            self.human_uno_called = delta['uno']
+        if 'winner' in delta:
+            self.winner = delta['winner']
+
+    def is_playable(self, card):
+        return is_playable(card, self.discard_pile[-1])
+
+
+class TableClient:
+    # kết nối tới server.py: một thread đọc socket và đẩy delta vào queue.Queue,
+    # Tk lấy ra bằng after() (như AIWorkerPool) nên GUI không bao giờ chặn vì mạng
+    def __init__(self, address, name='You'):
+        self.sock = open_socket(address)
+        self.file = self.sock.makefile('rb')
+        self.view = TableView()
+        self.updates = queue.Queue()
+        self.root = None
+        self.on_update = None
+        self._closed = False
+        # đã gửi nước đi, chờ server trả lời: không cho đi tiếp lần nữa
+        self._moved = False
+        self.send({'op': 'join', 'name': name})
+        # view đầy đủ đầu tiên đọc ngay để GUI dựng được bàn
+        self.view.apply(json.loads(self.file.readline()))
+
+    def start(self, root, on_update):
+        # on_update(delta) chạy trên thread Tk sau khi view đã cập nhật; None = mất kết nối
+        self.root = root
+        self.on_update = on_update
+        threading.Thread(target=self._read, name='uno-client', daemon=True).start()
+        self.root.after(POLL_MS, self._poll)
+
+    def _read(self):
+        try:
+            for line in self.file:
+                self.updates.put(json.loads(line))
+        except (OSError, ValueError):
+            pass
+        self.updates.put(None)
+
+    def _poll(self):
+        while True:
+            try:
+                delta = self.updates.get_nowait()
+            except queue.Empty:
+                break
+            if delta is None:
+                self._closed = True
+            else:
+                self.view.apply(delta)
+                # nước đi đã được xử lý (bài trên tay đổi) hoặc bị từ chối
+                if 'hand' in delta or 'error' in delta:
+                    self._moved = False
+            self.on_update(delta)
+        if not self._closed:
+            self.root.after(POLL_MS, self._poll)
+
+    def send(self, msg):
+        try:
+            self.sock.sendall(json.dumps(msg, separators=(',', ':')).encode() + b'\n')
+        except OSError:
+            pass
+
+    def my_turn(self):
+        view = self.view
+        return not self._closed and not self._moved and view.winner is None and view.current == view.seat
+
+    def play(self, card_id, color=None):
+        self._moved = True
+        self.send({'op': 'play', 'card': card_id, 'color': color})
+
+    def draw(self):
+        self._moved = True
+        self.send({'op': 'draw'})
+
+    def call_uno(self):
+        self.send({'op': 'uno'})
+
+    def new_game(self):
+        self.send({'op': 'new'})
+
+    def close(self):
+        self._closed = True
+        self.sock.close()
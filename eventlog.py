@@ -0,0 +1,254 @@
+import argparse
+import mmap
+import struct
+from collections import namedtuple
+
+from game import (GameEngine, COLORS, COLOR_INDEX, DECK_LAYOUT, EVENTS, EV_GAME, EV_DRAW, EV_PLAY, EV_PASS,
+                  EV_PENALTY, EV_UNO)
+
+# file log: header 16 byte rồi các bản ghi 16 byte nối đuôi nhau, little-endian.
+# Mỗi ván bắt đầu bằng bản ghi 'game' mang seed, nên một file có thể chứa hàng
+# triệu ván từ simulate và vẫn replay được từng ván.
+MAGIC = b'UNOLOG\x00\x00'
+VERSION = 1
+HEADER = struct.Struct('<8sHHI')
+# kind, seat (255 = không có), card id (-1 = không có), màu (4 = chưa chọn), lượt, value
+RECORD = struct.Struct('<BBbBIQ')
+NO_SEAT = 255
+NO_CARD = -1
+# ghi xuống đĩa mỗi khi bộ đệm vượt ngưỡng này
+FLUSH_BYTES = 1 << 16
+# số bản ghi giải mã mỗi lần khi duyệt
+CHUNK = 4096
+
+# game: seat = số người chơi, card = ghế người thật (-1 nếu toàn bot), value = seed
+# value của draw: 1 nếu bị bắt rút; reshuffle: số lá; uno: 1 nếu đã hô
+Event = namedtuple('Event', ['kind', 'seat', 'card', 'color', 'turn', 'value'])
+# một ván trong file: bản ghi [start, stop)
+GameInfo = namedtuple('GameInfo', ['seed', 'players', 'human', 'start', 'stop'])
+
+
+class EventBuffer:
+    # bản ghi nhị phân trong bộ nhớ (vd. một chunk simulate trong worker process)
+    def __init__(self):
+        self.data = bytearray()
+
+    def record(self, kind, turn, seat=None, card=None, value=0):
+        if card is None:
+            cid, color = NO_CARD, COLOR_INDEX[None]
+        elif isinstance(card, int):
+            cid, color = card, COLOR_INDEX[None]
+        else:
+            cid, color = card.id, COLOR_INDEX[card.color]
+        self.data += RECORD.pack(kind, NO_SEAT if seat is None else seat, cid, color, turn, value)
+
+    def extend(self, data):
+        self.data += data
+
+
+class EventLog(EventBuffer):
+    # log chỉ ghi thêm vào cuối file; header chỉ ghi khi file còn rỗng
+    def __init__(self, path):
+        super().__init__()
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0))
+
+    def record(self, kind, turn, seat=None, card=None, value=0):
+        super().record(kind, turn, seat, card, value)
+        if len(self.data) >= FLUSH_BYTES:
+            self.flush()
+
+    def extend(self, data):
+        super().extend(data)
+        if len(self.data) >= FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.data)
+        self.file.flush()
+        self.data.clear()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EventReader:
+    # đọc qua mmap: không nạp cả file vào bộ nhớ, mỗi bản ghi chỉ giải mã khi
+    # được duyệt tới. Phần đuôi ghi dở (process bị giết giữa chừng) bị bỏ qua.
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size, _ = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            self.close()
+            raise ValueError(f'{path}: not an UNO event log (version {VERSION})')
+        self.count = (len(self.map) - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return Event._make(RECORD.unpack_from(self.map, HEADER.size + i * RECORD.size))
+
+    def events(self, start=0, stop=None):
+        stop = self.count if stop is None else min(stop, self.count)
+        if start >= stop:
+            return
+        # đọc từng khúc CHUNK bản ghi: bộ nhớ dùng cố định dù file lớn bao nhiêu
+        for first in range(start, stop, CHUNK):
+            last = min(stop, first + CHUNK)
+            block = self.map[HEADER.size + first * RECORD.size:HEADER.size + last * RECORD.size]
+            for fields in RECORD.iter_unpack(block):
+                yield Event._make(fields)
+
+    def __iter__(self):
+        return self.events()
+
+    def filter(self, kind=None, seat=None, start=0, stop=None):
+        # kind: tên ('play') hoặc số; seat: chỉ số ghế
+        if isinstance(kind, str):
+            kind = EVENTS.index(kind)
+        for event in self.events(start, stop):
+            if (kind is None or event.kind == kind) and (seat is None or event.seat == seat):
+                yield event
+
+    def games(self):
+        # bản ghi 'game' mở đầu từng ván -> GameInfo; chỉ đọc byte kind của mỗi bản ghi
+        first = None
+        for i in range(self.count):
+            if self.map[HEADER.size + i * RECORD.size] == EV_GAME:
+                if first is not None:
+                    yield GameInfo(first.value, first.seat, first.card, start, i)
+                first, start = self[i], i
+        if first is not None:
+            yield GameInfo(first.value, first.seat, first.card, start, self.count)
+
+    def game(self, index):
+        for i, game in enumerate(self.games()):
+            if i == index:
+                return game
+        raise IndexError(index)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def describe(event):
+    kind = EVENTS[event.kind]
+    parts = [f'#{event.turn:<5}', f'{kind:<9}']
+    if event.seat != NO_SEAT:
+        parts.append(f'seat {event.seat}')
+    if event.card != NO_CARD:
+        color, value = DECK_LAYOUT[event.card]
+        color = COLORS[event.color] if event.color < len(COLORS) else color
+        parts.append(f'{color} {value}' if color else value)
+    if event.kind in (EV_GAME, EV_PENALTY) or event.value and event.kind != EV_DRAW:
+        parts.append(f'({event.value})')
+    elif event.kind == EV_DRAW and event.value:
+        parts.append('(forced)')
+    return ' '.join(parts)
+
+
+def replay(reader, game, names=None):
+    # chạy lại một ván (GameInfo từ reader.games()) trên GameEngine mới cùng seed,
+    # theo đúng các nước trong log; yield engine lúc chia bài xong và sau mỗi lượt.
+    # Engine mới cũng ghi log vào bộ đệm và được so với log gốc: lệch nhau nghĩa
+    # là luật chơi đã đổi (hoặc có bug)
+    names = names or [f'Bot {i+1}' for i in range(game.players)]
+    human = None if game.human == NO_CARD else game.human
+    check = EventBuffer()
+    engine = GameEngine(names, human_index=human, seed=game.seed, log=check)
+    yield engine
+    for i, event in enumerate(reader.events(game.start, game.stop), game.start):
+        seat = event.seat
+        if event.kind == EV_PENALTY:
+            engine.pending_uno_penalty_index = seat
+            engine.apply_uno_penalty_if_pending()
+        elif event.kind == EV_DRAW and not event.value:
+            # lá người chơi tự rút: cho vào tay, nước đánh (nếu có) đến ở bản ghi play
+            card = engine.draw_card(seat)
+            if card is not None:
+                engine.players[seat].hand.append(card)
+        elif event.kind == EV_PLAY:
+            if seat == human:
+                # người thật hô UNO trước khi đánh: xem bản ghi uno ở cuối lượt này
+                engine.human_uno_called = _called_uno(reader, i + 1, game.stop, event.turn)
+            color = COLORS[event.color] if event.color < len(COLORS) else None
+            engine.apply_move(event.card, color)
+            yield engine
+        elif event.kind == EV_PASS:
+            engine.pass_turn()
+            yield engine
+    _verify(check.data, reader, game.start, game.stop)
+
+
+def _called_uno(reader, start, stop, turn):
+    # một lượt chỉ có vài bản ghi sau lá đánh (rút phạt Draw Two/Four rồi uno)
+    for event in reader.events(start, min(stop, start + 16)):
+        if event.turn != turn or event.kind in (EV_PLAY, EV_PASS):
+            return False
+        if event.kind == EV_UNO:
+            return event.value == 1
+    return False
+
+
+def _verify(data, reader, start, stop):
+    # log của lần chạy lại phải trùng từng byte với log gốc
+    original = reader.map[HEADER.size + start * RECORD.size:HEADER.size + stop * RECORD.size]
+    if data == original:
+        return
+    for i in range(0, min(len(data), len(original)), RECORD.size):
+        if data[i:i + RECORD.size] != original[i:i + RECORD.size]:
+            break
+    else:
+        i = min(len(data), len(original))
+    n = start + i // RECORD.size
+    got = Event._make(RECORD.unpack_from(data, i)) if i < len(data) else None
+    raise AssertionError(f'replay diverged at event {n}: log has {describe(reader[n]) if n < stop else "end"}, '
+                         f'replay has {describe(got) if got else "end"}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='eventlog', description='đọc/lọc log sự kiện UNO')
+    parser.add_argument('path')
+    parser.add_argument('--game', type=int, default=None, help='chỉ in ván thứ N')
+    parser.add_argument('--kind', choices=EVENTS, default=None)
+    parser.add_argument('--seat', type=int, default=None)
+    parser.add_argument('--games', action='store_true', help='liệt kê các ván (seed, số sự kiện)')
+    parser.add_argument('--verify', action='store_true', help='replay từng ván và so với log')
+    args = parser.parse_args(argv)
+    with EventReader(args.path) as reader:
+        if args.games or args.verify:
+            for i, game in enumerate(reader.games()):
+                if args.verify:
+                    for _ in replay(reader, game):
+                        pass
+                print(f'game {i}: seed {game.seed}, {game.players} players, {game.stop - game.start} events')
+            return
+        start, stop = 0, None
+        if args.game is not None:
+            game = reader.game(args.game)
+            start, stop = game.start, game.stop
+        for event in reader.filter(args.kind, args.seat, start, stop):
+            print(describe(event))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,126 @@
 import random
+from collections import deque, namedtuple
+from itertools import islice
 
 COLORS = ['Red', 'Yellow', 'Green', 'Blue']
 VALUES = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', 'Skip', 'Reverse', 'Draw Two']
 SPECIALS = ['Wild', 'Wild Draw Four']
 
+# mã hoá số nguyên: mỗi lá trong bộ 108 lá có id 0..107 theo thứ tự tạo bài,
+# trạng thái lá trên cùng = chỉ số màu (4 = chưa chọn màu) * 15 + chỉ số giá trị
+ALL_VALUES = VALUES + SPECIALS
+COLOR_INDEX = {c: i for i, c in enumerate(COLORS)}
+COLOR_INDEX[None] = len(COLORS)
+VALUE_INDEX = {v: i for i, v in enumerate(ALL_VALUES)}
+NUM_STATES = (len(COLORS) + 1) * len(ALL_VALUES)
+
+
+def _build_layout():
+    # (màu, giá trị) cho từng id, cùng thứ tự bộ bài chuẩn
+    layout = []
+    for color in COLORS:
+        layout.append((color, '0'))
+        for value in VALUES[1:]:
+            layout.extend([(color, value)] * 2)
+    for special in SPECIALS:
+        layout.extend([(None, special)] * 4)
+    return layout
+
+
+DECK_LAYOUT = _build_layout()
+NUM_CARDS = len(DECK_LAYOUT)
+
+
+def card_state(color, value):
+    return COLOR_INDEX[color] * len(ALL_VALUES) + VALUE_INDEX[value]
+
+
+def _build_playable():
+    # PLAYABLE[state] là bitmask 108 bit: bit i bật nếu lá id i đánh được
+    table = []
+    for top_color in COLORS + [None]:
+        for top_value in ALL_VALUES:
+            mask = 0
+            for cid, (color, value) in enumerate(DECK_LAYOUT):
+                if (value in SPECIALS or color == top_color or
+                        value == top_value or color is None):
+                    mask |= 1 << cid
+            table.append(mask)
+    return table
+
+
+PLAYABLE = _build_playable()
+
+
+# loại lá (màu, giá trị) không phân biệt 2 bản sao: 54 loại, dùng cho Hand
+KINDS = list(dict.fromkeys(DECK_LAYOUT))
+KIND_INDEX = {k: i for i, k in enumerate(KINDS)}
+CARD_KIND = [KIND_INDEX[k] for k in DECK_LAYOUT]
+KIND_BITS = 3  # mỗi loại có tối đa 4 lá -> 3 bit đếm
+
+
+def _build_playable_kinds():
+    # cùng luật với PLAYABLE nhưng theo loại: 0b111 ở ô của mỗi loại đánh được
+    table = []
+    for mask in PLAYABLE:
+        fields = 0
+        for cid in range(NUM_CARDS):
+            if (mask >> cid) & 1:
+                fields |= 7 << (KIND_BITS * CARD_KIND[cid])
+        table.append(fields)
+    return table
+
+
+PLAYABLE_KINDS = _build_playable_kinds()
+
+
+MASK64 = (1 << 64) - 1
+
+# các loại sự kiện engine ghi vào log (định dạng file: eventlog.py)
+EVENTS = ('game', 'deal', 'top', 'draw', 'play', 'pass', 'reshuffle', 'penalty', 'uno', 'win')
+EV_GAME, EV_DEAL, EV_TOP, EV_DRAW, EV_PLAY, EV_PASS, EV_RESHUFFLE, EV_PENALTY, EV_UNO, EV_WIN = range(len(EVENTS))
+
+
+def split_seed(seed, index):
+    # splitmix64 trên (seed, index): luồng seed theo bộ đếm, mỗi ván một seed
+    # độc lập nên có thể chia đều cho nhiều process mà vẫn replay được
+    z = (seed * 0x9E3779B97F4A7C15 + (index + 1) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def playable_mask(top_card):
+    return PLAYABLE[card_state(top_card.color, top_card.value)]
+
+
+def is_playable(card, top_card):
+    return (playable_mask(top_card) >> card.id) & 1 == 1
+
+
+# ảnh chụp bất biến của ván nhìn từ ghế seat (chỉ thông tin công khai + bài trên
+# tay mình), gửi sang thread/process khác để bot suy nghĩ. Nước đi trả về là
+# (card_id, color): card_id None = rút 1 lá, color None = để engine tự chọn màu
+Snapshot = namedtuple('Snapshot', ['seat', 'hand', 'top', 'top_state', 'direction', 'hand_sizes',
+                                   'discard', 'deck_count', 'turns'])
+
+
+def first_legal_move(snapshot):
+    # lá hợp lệ đầu tiên trên tay, không có thì rút
+    mask = PLAYABLE[snapshot.top_state]
+    for cid in snapshot.hand:
+        if (mask >> cid) & 1:
+            return cid, None
+    return None, None
+
 
 class Card:
-    def __init__(self, color, value):
+    __slots__ = ('color', 'value', 'id')
+
+    def __init__(self, color, value, cid=None):
         self.color = color
         self.value = value
+        self.id = cid
 
     def __str__(self):
         if self.color:
@@ -18,28 +130,110 @@ class Card:
 
 
 class Deck:
-    def __init__(self):
-        self.cards = []
-        for color in COLORS:
-            self.cards.append(Card(color, '0'))
-            for value in VALUES[1:]:
-                # tạo bản sao riêng cho mỗi lá, tránh trỏ cùng một object
-                self.cards.extend([Card(color, value) for _ in range(2)])
-        for special in SPECIALS:
-            # mỗi lá wild là một object riêng, không chia sẻ tham chiếu
-            self.cards.extend([Card(None, special) for _ in range(4)])
-        random.shuffle(self.cards)
+    def __init__(self, rng=None, cards=None):
+        # rng: random.Random riêng để ván chơi replay được; mặc định dùng module random
+        self.rng = rng if rng is not None else random
+        # cards: dùng đúng các lá này theo thứ tự cho sẵn (không trộn)
+        if cards is None:
+            # mỗi lá là một object riêng (không chia sẻ tham chiếu), id theo DECK_LAYOUT
+            cards = [Card(color, value, cid) for cid, (color, value) in enumerate(DECK_LAYOUT)]
+            self.rng.shuffle(cards)
+        # rút ở cuối, thêm vào đáy: cả hai O(1) với deque
+        self.cards = deque(cards)
 
     def draw(self):
         return self.cards.pop() if self.cards else None
 
     def add(self, card):
-        self.cards.insert(0, card)
+        self.cards.appendleft(card)
+
+    def refill(self, pile, n):
+        # trộn n lá đầu của pile ngay tại chỗ (Fisher–Yates), reset màu wild
+        # mà không tạo lá mới, rồi chuyển chúng xuống đáy bộ bài
+        for i in range(n):
+            card = pile[i]
+            if card.value in SPECIALS:
+                card.color = None
+        rand = self.rng.random
+        for i in range(n - 1, 0, -1):
+            j = int(rand() * (i + 1))
+            pile[i], pile[j] = pile[j], pile[i]
+        self.cards.extendleft(islice(pile, n))
+        del pile[:n]
 
     def count(self):
         return len(self.cards)
 
 
+class Hand:
+    # tay bài dạng bitset: bộ đếm 3 bit cho mỗi loại lá, gói trong một int.
+    # thêm/bớt, "có lá đánh được không", hash và copy đều O(1)
+    __slots__ = ('bits', 'size')
+
+    def __init__(self, bits=0, size=0):
+        self.bits = bits
+        self.size = size
+
+    @classmethod
+    def from_cards(cls, cards):
+        hand = cls()
+        for card in cards:
+            hand.add(CARD_KIND[card.id])
+        return hand
+
+    def add(self, kind):
+        self.bits += 1 << (KIND_BITS * kind)
+        self.size += 1
+
+    def remove(self, kind):
+        if not self.count(kind):
+            raise ValueError(f'{KINDS[kind]} not in hand')
+        self.bits -= 1 << (KIND_BITS * kind)
+        self.size -= 1
+
+    def count(self, kind):
+        return (self.bits >> (KIND_BITS * kind)) & 7
+
+    def has_playable(self, state):
+        return self.bits & PLAYABLE_KINDS[state] != 0
+
+    def playable(self, state):
+        # các loại lá đánh được, tăng dần theo chỉ số loại
+        kinds = []
+        rest = self.bits & PLAYABLE_KINDS[state]
+        while rest:
+            kind = ((rest & -rest).bit_length() - 1) // KIND_BITS
+            kinds.append(kind)
+            rest &= ~(7 << (KIND_BITS * kind))
+        return kinds
+
+    def copy(self):
+        return Hand(self.bits, self.size)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, kind):
+        return self.count(kind) > 0
+
+    def __iter__(self):
+        rest = self.bits
+        while rest:
+            kind = ((rest & -rest).bit_length() - 1) // KIND_BITS
+            for _ in range(self.count(kind)):
+                yield kind
+            rest &= ~(7 << (KIND_BITS * kind))
+
+    def __eq__(self, other):
+        return isinstance(other, Hand) and self.bits == other.bits
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __repr__(self):
+        return f"Hand({', '.join(' '.join(filter(None, KINDS[k])) for k in self)})"
+
+
 class Player:
     def __init__(self, name, is_human=False):
         self.name = name
@@ -53,19 +247,235 @@ class Player:
                 self.hand.append(card)
 
     def play(self, top_card):
-        # simple AI: play first legal; wild luôn có thể đánh
+        # simple AI: play first legal; wild luôn có thể đánh (tra bảng PLAYABLE)
+        mask = playable_mask(top_card)
         for i, card in enumerate(self.hand):
-            if (
-                card.value in SPECIALS or
-                card.color == top_card.color or
-                card.value == top_card.value or
-                card.color is None
-            ):
+            if (mask >> card.id) & 1:
                 return self.hand.pop(i)
         return None
 
+    def decide(self, snapshot, budget=None):
+        # cùng luật với play nhưng chỉ đọc snapshot, an toàn khi chạy ngoài main thread
+        return first_legal_move(snapshot)
+
+    def choose_color(self, rng):
+        # màu cho lá wild; bot đơn giản chọn ngẫu nhiên
+        return rng.choice(COLORS)
+
     def has_uno(self):
         return len(self.hand) == 1
 
     def is_winner(self):
-        return len(self.hand) == 0
\ No newline at end of file
+        return len(self.hand) == 0
+
+class GameEngine:
+    # toàn bộ luật chơi, không phụ thuộc Tk: GUI chỉ là lớp hiển thị bên trên
+    def __init__(self, player_names, human_index=None, hand_size=7, seed=None, rng=None, bot=Player, deck=None,
+                 log=None):
+        # cùng seed -> cùng ván đấu (bộ bài, màu wild của bot); không cho seed thì
+        # tự chọn một seed để ván vẫn replay được từ log
+        if rng is None and seed is None:
+            seed = random.getrandbits(64)
+        if log is not None and (seed is None or not 0 <= seed <= MASK64):
+            # replay dựng lại ván từ seed trong log (ô 64 bit không dấu): rng tự cho
+            # hoặc seed ngoài khoảng thì không ghi log được
+            raise ValueError(f'cannot log a game without a 64-bit seed (seed={seed!r})')
+        self.seed = seed
+        self.rng = rng if rng is not None else random.Random(seed)
+        # màu wild của bot lấy từ luồng ngẫu nhiên riêng: màu được chọn thế nào (bot,
+        # người chơi, replay từ log) cũng không làm lệch thứ tự trộn bài về sau
+        self.color_rng = rng if rng is not None else random.Random(split_seed(seed, 1))
+        # log: nơi ghi sự kiện (eventlog.EventLog/EventBuffer), None = không ghi
+        self.log = log
+        # deck cho sẵn: dựng ván từ một trạng thái có trước (vd. determinization của bot)
+        self.deck = deck if deck is not None else Deck(self.rng)
+        # bot: hàm tạo người chơi máy từ tên (mặc định Player đánh lá hợp lệ đầu tiên)
+        self.players = [Player(name, is_human=True) if i == human_index else bot(name)
+                        for i, name in enumerate(player_names)]
+        for p in self.players:
+            p.draw(self.deck, hand_size)
+        self.discard_pile = [self.deck.draw()] if self.deck.count() else []
+        self.direction = 1
+        self.current = 0
+        # UNO state
+        self.human_uno_called = False
+        self.pending_uno_penalty_index = None
+        self.winner = None
+        # thống kê cho chạy mô phỏng
+        self.turns = 0
+        self.cards_drawn = [0] * len(self.players)
+        self.reshuffles = [0] * len(self.players)
+        if log is not None:
+            # ván mới: seat = số người chơi, card = ghế người thật (nếu có), value = seed
+            log.record(EV_GAME, 0, len(self.players), human_index, value=seed)
+            for seat, p in enumerate(self.players):
+                for card in p.hand:
+                    log.record(EV_DEAL, 0, seat, card)
+            if self.discard_pile:
+                log.record(EV_TOP, 0, None, self.discard_pile[-1])
+
+    def top_card(self):
+        return self.discard_pile[-1]
+
+    def is_playable(self, card):
+        return is_playable(card, self.discard_pile[-1])
+
+    def next_player(self):
+        self.current = (self.current + self.direction) % len(self.players)
+
+    def reshuffle_discard_into_deck(self):
+        # giữ lá trên cùng, phần còn lại của chồng huỷ được trộn lại vào bộ
+        n = len(self.discard_pile) - 1
+        if n <= 0:
+            return False
+        self.deck.refill(self.discard_pile, n)
+        return True
+
+    def draw_card(self, index=None, forced=False):
+        # rút 1 lá cho người ở vị trí index, trộn lại chồng huỷ nếu bộ bài đã hết;
+        # forced: bị bắt rút (phạt UNO, Draw Two/Four), không phải nước đi của người đó
+        if self.deck.count() == 0:
+            n = len(self.discard_pile) - 1
+            if self.reshuffle_discard_into_deck():
+                if index is not None:
+                    self.reshuffles[index] += 1
+                if self.log is not None:
+                    self.log.record(EV_RESHUFFLE, self.turns, index, value=n)
+        card = self.deck.draw()
+        if card is not None and index is not None:
+            self.cards_drawn[index] += 1
+        if self.log is not None and card is not None:
+            self.log.record(EV_DRAW, self.turns, index, card, forced)
+        return card
+
+    def draw_cards(self, index, count):
+        hand = self.players[index].hand
+        for _ in range(count):
+            card = self.draw_card(index, forced=True)
+            if card is None:
+                break
+            hand.append(card)
+
+    def apply_uno_penalty_if_pending(self):
+        # áp dụng phạt +2 nếu người chơi quên hô UNO; trả về index bị phạt
+        idx = self.pending_uno_penalty_index
+        if idx is None:
+            return None
+        if self.log is not None:
+            self.log.record(EV_PENALTY, self.turns, idx)
+        self.draw_cards(idx, 2)
+        self.pending_uno_penalty_index = None
+        if self.players[idx].is_human:
+            self.human_uno_called = False
+        return idx
+
+    def apply_card(self, card):
+        # đặt lá lên chồng huỷ và áp dụng hiệu ứng
+        if self.log is not None:
+            self.log.record(EV_PLAY, self.turns, self.current, card)
+        self.discard_pile.append(card)
+        value = card.value
+        if value == 'Reverse':
+            self.direction *= -1
+        elif value == 'Skip':
+            self.next_player()
+        elif value == 'Draw Two':
+            self.next_player()
+            self.draw_cards(self.current, 2)
+        elif value == 'Wild Draw Four':
+            self.next_player()
+            self.draw_cards(self.current, 4)
+
+    def finish_play(self, index):
+        # xử lý UNO/thắng rồi chuyển lượt
+        player = self.players[index]
+        if player.has_uno() and player.is_human:
+            if self.human_uno_called:
+                self.human_uno_called = False
+                self.pending_uno_penalty_index = None
+            else:
+                # sẽ bị phạt +2 khi tới lượt kế tiếp bắt đầu
+                self.pending_uno_penalty_index = index
+        if self.log is not None:
+            if player.has_uno():
+                # value 0: người chơi quên hô, sẽ bị phạt ở lượt sau
+                self.log.record(EV_UNO, self.turns, index, value=int(self.pending_uno_penalty_index != index))
+            if player.is_winner():
+                self.log.record(EV_WIN, self.turns, index)
+        if player.is_winner():
+            self.winner = index
+        self.next_player()
+        self.turns += 1
+
+    def play_card(self, hand_index, color=None):
+        # người chơi hiện tại đánh lá ở vị trí hand_index
+        index = self.current
+        card = self.players[index].hand.pop(hand_index)
+        if card.color is None and card.value in SPECIALS and color:
+            card.color = color
+        self.apply_card(card)
+        self.finish_play(index)
+        return card
+
+    def pass_turn(self):
+        if self.log is not None:
+            self.log.record(EV_PASS, self.turns, self.current)
+        self.next_player()
+        self.turns += 1
+
+    def snapshot(self, seat=None):
+        seat = self.current if seat is None else seat
+        top = self.discard_pile[-1]
+        return Snapshot(seat, tuple(c.id for c in self.players[seat].hand), top.id,
+                        card_state(top.color, top.value), self.direction,
+                        tuple(len(p.hand) for p in self.players),
+                        tuple(c.id for c in self.discard_pile), self.deck.count(), self.turns)
+
+    def apply_move(self, card_id=None, color=None):
+        # áp dụng nước đi (card_id, color) do bot quyết định trên snapshot
+        index = self.current
+        hand = self.players[index].hand
+        card = None
+        if card_id is not None:
+            pos = next((i for i, c in enumerate(hand) if c.id == card_id), None)
+            if pos is None or not self.is_playable(hand[pos]):
+                raise ValueError(f'illegal move: card {card_id}')
+            card = hand.pop(pos)
+        return self.finish_move(index, card, color)
+
+    def ai_turn(self):
+        # một lượt của bot: đánh lá hợp lệ đầu tiên, nếu không có thì rút 1 lá
+        index = self.current
+        return self.finish_move(index, self.players[index].play(self.discard_pile[-1]))
+
+    def finish_move(self, index, card, color=None):
+        # card đã rời tay người chơi; None = rút 1 lá và đánh luôn nếu được
+        player = self.players[index]
+        top = self.discard_pile[-1]
+        if card is None:
+            drawn = self.draw_card(index)
+            if drawn is not None:
+                if is_playable(drawn, top):
+                    card = drawn
+                else:
+                    # không chơi được -> thêm vào tay
+                    player.hand.append(drawn)
+        if card is not None:
+            # nếu wild, bot chọn màu
+            if card.color is None and card.value in SPECIALS:
+                card.color = color or player.choose_color(self.color_rng)
+            self.apply_card(card)
+            self.finish_play(index)
+        else:
+            self.pass_turn()
+        return card
+
+    def step(self):
+        # một lượt đầy đủ cho chế độ headless (mọi người chơi đều là bot)
+        self.apply_uno_penalty_if_pending()
+        return self.ai_turn()
+
+    def play_game(self, max_turns=5000):
+        while self.winner is None and self.turns < max_turns:
+            self.step()
+        return self.winner
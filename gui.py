@@ -1,11 +1,127 @@
 import tkinter as tk
 from tkinter import messagebox, filedialog
 import math
-import random
-from game import Deck, Player, COLORS
+import time
+from bisect import bisect_right
+from functools import lru_cache
+from game import GameEngine, Player, COLORS, SPECIALS, playable_mask, first_legal_move
+from ai_worker import AIWorkerPool
+from scheduler import FrameClock, Future
+from sprites import SpriteAtlas
+
+# thứ tự vẽ từ dưới lên; item tạm của animation luôn nằm trên cùng
+LAYERS = ('background', 'bot_hands', 'hand', 'avatars', 'deck', 'discard', 'info', 'turn', 'anim', 'toast', 'picker', 'perf')
+# các item của một lá trên tay (key '<index>_<part>' trong layer 'hand')
+CARD_PARTS = ('card', 'value', 'color')
+# nhịp cập nhật overlay số đo (chỉ khi bật perf)
+PERF_OVERLAY_MS = 500
+# sprite lá bài: các lớp (inset, fill, outline, outline_width), xem SpriteAtlas
+BOT_BACK = ((0, '#111', 'white', 1), (3, '#333', 'white', 1))
+DECK_CARD = ((0, '#222', 'white', 1),)
+
+
+def card_layers(fill, playable=False, selected=False):
+    layers = ((0, '#111', 'white', 1), (3, fill, 'white', 1))
+    if playable:
+        layers += ((-3, '', '#00e0ff', 2),)
+    if selected:
+        layers += ((-4, '', 'yellow', 3),)
+    return layers
+
+
+def discard_layers(fill):
+    return ((0, '#111', 'white', 1), (4, fill, 'white', 2))
+
+
+# một frame màn hình (~60 fps)
+FRAME_MS = 16
+# bot có think_ms (ismcts): hạn của AIWorkerPool = think_ms + chừng này để bot nghĩ đủ thời gian
+AI_BUDGET_MARGIN_MS = 100
+# phần trạng thái game -> các layer phụ thuộc vào nó
+WATCH_LAYERS = {
+    'human_hand': ('hand', 'info'),
+    'bot_hands': ('bot_hands', 'avatars'),
+    'deck': ('deck',),
+    'top': ('discard', 'hand'),
+    'current': ('avatars', 'hand', 'turn'),
+    'direction': ('turn',),
+    'uno': ('deck',),
+    'names': ('avatars', 'turn'),
+}
+
+
+def hover_offset(i, hover):
+    # lá đang hover nhô lên, các lá khác dạt sang hai bên
+    if hover is None:
+        return (0, 0)
+    if i == hover:
+        return (0, -12)
+    return (8 if i > hover else -8, 0)
+
+
+class HandLayout:
+    # vị trí mọi lá trên tay người chơi cho một (kích thước, số lá, hover);
+    # draw_hand, hit-test và animation đều đọc từ đây nên luôn khớp nhau
+    def __init__(self, width, height, card_width, card_height, count, hover):
+        margin = 20
+        self.card_width = card_width
+        self.card_height = card_height
+        self.step = card_width - 30
+        # compute spacing to center hand if many cards
+        total_w = max(0, count-1) * self.step + card_width
+        self.start_x = max(margin, (width - total_w)//2)
+        self.y = height - card_height/2 - 30
+        # tâm từng lá (đã cộng độ lệch hover)
+        self.centers = []
+        for i in range(count):
+            dx, dy = hover_offset(i, hover)
+            self.centers.append((self.slot(i) + dx, self.y + dy))
+        # mép trái/phải theo vị trí gốc (không tính hover), dùng cho hit-test
+        self.lefts = [self.slot(i) - card_width/2 for i in range(count)]
+        self.rights = [self.slot(i) + card_width/2 for i in range(count)]
+        self.top = self.y - card_height/2
+        self.bottom = self.y + card_height/2
+
+    def slot(self, index):
+        return self.start_x + index * self.step
+
+    def hand_index(self, x, y, padx=0, pady=0):
+        # lá bên trái nhất chứa điểm (x, y) — các lá chồng lên nhau
+        if not (self.top - pady <= y <= self.bottom + pady):
+            return None
+        i = bisect_right(self.rights, x - padx)
+        if i < len(self.lefts) and self.lefts[i] - padx <= x:
+            return i
+        return None
+
+
+@lru_cache(maxsize=32)
+def hand_layout(width, height, card_width, card_height, count, hover):
+    return HandLayout(width, height, card_width, card_height, count, hover)
+
+
+class HitIndex:
+    # bảng hit-test thuần Python, dựng lại khi layout hoặc số lá trên tay đổi:
+    # tay bài tra bằng bisect trên HandLayout, các vùng còn lại là hình chữ nhật cố định
+    def __init__(self, key, layout, rects):
+        self.key = key
+        self.layout = layout
+        # [(tên vùng, x0, y0, x1, y1)] theo thứ tự ưu tiên khi click
+        self.rects = rects
+
+    def hand_index(self, x, y, padx=0, pady=0):
+        return self.layout.hand_index(x, y, padx, pady)
+
+    def hit(self, x, y):
+        for name, x0, y0, x1, y1 in self.rects:
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                return name
+        return None
+
 
 class UnoGUI:
-    def __init__(self, root, player_names):
+    def __init__(self, root, player_names, seed=None, speed=1.0, demo=False, bot=Player, log=None, perf=None,
+                 remote=None):
         self.root = root
         self.root.title('UNO - Round Table')
         self.width = 900
@@ -16,17 +132,32 @@ class UnoGUI:
         # resize handling
         self.canvas.bind('<Configure>', self.on_resize)
 
-        # Game logic
-        self.deck = Deck()
-        self.players = [Player(name, is_human=(i == 0)) for i, name in enumerate(player_names)]
-        for p in self.players:
-            p.draw(self.deck, 7)
-        self.discard_pile = [self.deck.draw()]
-        self.direction = 1
-        self.current = 0
-        # UNO state
-        self.human_uno_called = False
-        self.pending_uno_penalty_index = None
+        # Game logic (luật chơi nằm trong GameEngine, GUI chỉ hiển thị)
+        # bàn tròn luôn có đủ 4 chỗ ngồi
+        player_names = list(player_names)
+        while len(player_names) < 4:
+            player_names.append(f'Bot {len(player_names)+1}')
+        self.demo = demo
+        self.bot = bot
+        # log sự kiện (eventlog.EventLog) dùng chung cho mọi ván trong phiên chơi
+        self.log = log
+        # số đo hiệu năng (perf.Recorder), None = tắt
+        self.perf = perf
+        # remote (client.TableClient): ván chạy trên server.py, GUI chỉ hiển thị view
+        # và gửi nước đi của người chơi
+        self.remote = remote
+        if remote is not None:
+            self.engine = remote.view
+        else:
+            # demo: cả 4 ghế đều là bot
+            self.engine = GameEngine(player_names, human_index=None if demo else 0, seed=seed, bot=bot, log=log)
+        # bot suy nghĩ trên thread nền để UI không bị đứng
+        self.ai_pool = AIWorkerPool(root)
+        # một đồng hồ frame chung cho mọi animation và delay giữa lượt
+        self.clock = FrameClock(root, frame_ms=FRAME_MS, speed=speed)
+        self.clock.perf = perf
+        # ảnh lá bài dựng sẵn theo kích thước lá
+        self.sprites = SpriteAtlas(root)
 
         # UI state defaults (will be recalculated in draw_table)
         self.center = (self.width // 2, self.height // 2)
@@ -43,23 +174,167 @@ class UnoGUI:
         self.avatar_images = {}
 
         # user interaction bindings
-        self.canvas.bind('<Button-1>', self.on_click)
-        self.canvas.bind('<Motion>', self.on_mouse_move)
+        self.canvas.bind('<Button-1>', self._timed('on_click', self.on_click))
+        self.canvas.bind('<Motion>', self._timed('on_mouse_move', self.on_mouse_move))
         self.canvas.bind('<Double-Button-1>', self.on_double_click)
+        # hẹn thoát sau khi có người thắng (announce_winner); F2 chơi ván mới thì huỷ
+        self._quit_id = None
+        # F2: ván mới
+        self.root.bind('<F2>', lambda e: self.new_game())
+        # F3: bật/tắt overlay số đo
+        self._perf_overlay = perf is not None
+        if perf is not None:
+            self.root.bind('<F3>', lambda e: self.toggle_perf_overlay())
+            self.root.after(PERF_OVERLAY_MS, self._perf_tick)
 
         # selection/hover state
         self.selected_index = None
         self.hover_index = None
 
-        # initial draw and AI scheduling
-        self.draw_table()
-        self.root.after(500, self.ai_turn_if_needed)
+        # retained canvas items: layer -> key -> [item id, coords, options]
+        self._layer_items = {}
+        self._touched = set()
+        self._restack = False
+        # dirty layers chờ vẽ và trạng thái game đã vẽ lần trước
+        self._dirty = set()
+        self._flush_id = None
+        self._watched = {}
+        self._layout_size = None
+        # kích thước canvas theo <Configure>, và kích thước nền tĩnh đã vẽ
+        self._canvas_size = None
+        self._background_size = None
+        self._hit_index = None
+        # vị trí chuột mới nhất và callback hover đang chờ
+        self._pointer = (0, 0)
+        self._pointer_time = 0.0
+        self._hover_id = None
+        # toast đang hiện và hộp chọn màu đang chờ
+        self._toasts = []
+        self._color_future = None
+        self._picker_rects = []
+        # Future chờ nước đi của người chơi, chỉ có khi đang đến lượt người chơi
+        self._human_move = None
+
+        # initial draw; một task duy nhất điều khiển toàn bộ lượt chơi
+        self.refresh()
+        self.invalidate()
+        if remote is not None:
+            self.turn_task = None
+            remote.start(root, self.on_remote_update)
+        else:
+            self.turn_task = self.clock.spawn(self.turn_loop())
+
+    # trạng thái game được đọc thẳng từ engine
+    @property
+    def deck(self):
+        return self.engine.deck
+
+    @property
+    def players(self):
+        return self.engine.players
+
+    @property
+    def discard_pile(self):
+        return self.engine.discard_pile
+
+    @property
+    def direction(self):
+        return self.engine.direction
+
+    @property
+    def current(self):
+        return self.engine.current
+
+    @property
+    def pending_uno_penalty_index(self):
+        return self.engine.pending_uno_penalty_index
+
+    @property
+    def human_uno_called(self):
+        return self.engine.human_uno_called
+
+    @human_uno_called.setter
+    def human_uno_called(self, value):
+        self.engine.human_uno_called = value
+        if self.remote is not None and value:
+            self.remote.call_uno()
+
+    # --- retained-mode canvas ---
+    # mỗi item được giữ lại giữa các lần vẽ theo (layer, key); chỉ gọi coords /
+    # itemconfig khi toạ độ hoặc thuộc tính thay đổi, item không còn dùng thì xoá
+    def _begin_layer(self, layer):
+        self._layer_items.setdefault(layer, {})
+        self._touched = set()
+
+    def _put(self, layer, key, kind, coords, **opts):
+        items = self._layer_items[layer]
+        self._touched.add(key)
+        entry = items.get(key)
+        if entry is None:
+            tags = opts.get('tags', ())
+            item = getattr(self.canvas, 'create_' + kind)(*coords, **dict(opts, tags=tags + (layer,)))
+            items[key] = [item, coords, opts]
+            self._restack = True
+            return item
+        item, old_coords, old_opts = entry
+        if old_coords != coords:
+            self.canvas.coords(item, *coords)
+            entry[1] = coords
+        if old_opts != opts:
+            changed = {k: v for k, v in opts.items() if old_opts.get(k) != v}
+            changed.pop('tags', None)
+            if changed:
+                self.canvas.itemconfig(item, **changed)
+            entry[2] = opts
+        return item
 
-    def draw_table(self):
-        self.canvas.delete('all')
-        # chỉnh cửa sổ
-        w = max(self.canvas.winfo_width(), 200)
-        h = max(self.canvas.winfo_height(), 200)
+    def _end_layer(self, layer):
+        items = self._layer_items[layer]
+        for key in [k for k in items if k not in self._touched]:
+            self.canvas.delete(items.pop(key)[0])
+
+    # --- dirty layers: mọi thay đổi chỉ đánh dấu layer, vẽ gộp một lần trong after_idle ---
+    def invalidate(self, *layers):
+        self._dirty.update(layers or LAYERS)
+        if self._flush_id is None:
+            self._flush_id = self.root.after_idle(self._flush)
+
+    def refresh(self):
+        # so trạng thái game với lần vẽ trước, chỉ đánh dấu các layer bị ảnh hưởng
+        engine = self.engine
+        top = engine.discard_pile[-1]
+        watched = {
+            'human_hand': tuple(c.id for c in self.players[0].hand),
+            'bot_hands': tuple(len(p.hand) for p in self.players),
+            'deck': engine.deck.count(),
+            'top': (top.id, top.color),
+            'current': engine.current,
+            'direction': engine.direction,
+            'uno': engine.human_uno_called,
+            'names': tuple(p.name for p in self.players),
+        }
+        changed = [k for k, v in watched.items() if self._watched.get(k) != v]
+        self._watched = watched
+        layers = set()
+        for key in changed:
+            layers.update(WATCH_LAYERS[key])
+        if layers:
+            self.invalidate(*layers)
+
+    def _flush(self):
+        self._flush_id = None
+        dirty, self._dirty = self._dirty, set()
+        self.draw_table(dirty)
+
+    def update_layout(self):
+        # chỉnh cửa sổ; trả về True nếu kích thước đổi (mọi layer phải vẽ lại)
+        if self._canvas_size is None:
+            self._canvas_size = (self.canvas.winfo_width(), self.canvas.winfo_height())
+        w = max(self._canvas_size[0], 200)
+        h = max(self._canvas_size[1], 200)
+        if (w, h) == self._layout_size:
+            return False
+        self._layout_size = (w, h)
         self.width = w
         self.height = h
         # đẩy bàn chơi lên trên để các avatar và tay bài không bị che
@@ -72,68 +347,109 @@ class UnoGUI:
         margin = 24
         self.deck_pos = (self.width - margin - self.card_width//2, self.height - margin - self.card_height//2)
         self.discard_pos = (self.center[0], self.center[1] - self.table_radius - 40)
-
-        # cảnh phòng và mặt bàn
-        self.draw_environment()
-        x, y = self.center
-        self.draw_table_surface(x, y)
-
         # fixed player positions (bottom human, left bot, top bot, right bot)
-        # ensure we have four players
-        while len(self.players) < 4:
-            self.players.append(Player(f'Bot {len(self.players)+1}'))
+        x, y = self.center
         pp_bottom = (x, y + self.table_radius + 60)
         pp_left = (x - self.table_radius - 90, y)
         pp_top = (x, y - self.table_radius - 60)
         pp_right = (x + self.table_radius + 90, y)
         self.player_positions = [pp_bottom, pp_left, pp_top, pp_right]
+        return True
+
+    def draw_table(self, layers=None):
+        if self.perf is None:
+            self._draw_table(layers)
+            return
+        t0 = time.perf_counter()
+        self._draw_table(layers)
+        self.perf.add('draw_table', (time.perf_counter() - t0) * 1000)
+        self.perf.add('canvas_items', len(self.canvas.find_all()), 'items')
+
+    def _draw_table(self, layers):
+        # vẽ lại các layer được yêu cầu (mặc định: tất cả)
+        if self.update_layout() or layers is None:
+            layers = LAYERS
+        painters = {
+            # cảnh phòng và mặt bàn
+            'background': self.draw_background,
+            # hình ảnh bot cầm bài
+            'bot_hands': self.draw_bot_hands,
+            'hand': lambda: self.draw_hand(self.players[0]),
+            'avatars': self.draw_avatars,
+            # rút lá và huỷ
+            'deck': self.draw_deck,
+            'discard': self.draw_discard,
+            # mô tả bài
+            'info': self.draw_card_description,
+            # thông tin lượt và chiều
+            'turn': self.draw_turn_info,
+            # thông báo và hộp chọn màu
+            'toast': self.draw_toasts,
+            'picker': self.draw_color_picker,
+            'perf': self.draw_perf_overlay,
+        }
+        for layer in LAYERS:
+            if layer in layers and layer in painters:
+                painters[layer]()
+
+        # item mới được tạo ở trên cùng: sắp lại thứ tự các layer
+        if self._restack:
+            for layer in LAYERS:
+                self.canvas.tag_raise(layer)
+            self._restack = False
+
+    def avatar_centers(self):
+        # clamp so avatars stay visible inside canvas
+        avatar_w, avatar_h = 110, 48
+        margin = 12
+        return [(max(margin + avatar_w//2, min(self.width - margin - avatar_w//2, px)),
+                 max(margin + avatar_h//2, min(self.height - margin - avatar_h//2, py)))
+                for px, py in self.player_positions]
+
+    def draw_avatars(self):
+        self._begin_layer('avatars')
         avatar_w, avatar_h = 110, 48
+        centers = self.avatar_centers()
         for i, player in enumerate(self.players):
-            px, py = self.player_positions[i]
-            # clamp so avatars stay visible inside canvas
-            margin = 12
-            px = max(margin + avatar_w//2, min(self.width - margin - avatar_w//2, px))
-            py = max(margin + avatar_h//2, min(self.height - margin - avatar_h//2, py))
+            px, py = centers[i]
             # avatar frame (clickable)
-            self.canvas.create_rectangle(px - avatar_w//2, py - avatar_h//2, px + avatar_w//2, py + avatar_h//2,
-                                         fill='#222', outline='white', tags=(f'avatar_{i}',))
+            self._put('avatars', f'frame_{i}', 'rectangle',
+                      (px - avatar_w//2, py - avatar_h//2, px + avatar_w//2, py + avatar_h//2),
+                      fill='#222', outline='white', tags=(f'avatar_{i}',))
             # draw avatar image if set, otherwise placeholder text
             img = self.avatar_images.get(i)
             if img:
                 # image is centered on avatar
-                self.canvas.create_image(px, py, image=img, tags=(f'avatar_img_{i}',))
+                self._put('avatars', f'img_{i}', 'image', (px, py), image=img, tags=(f'avatar_img_{i}',))
             else:
                 # placeholder: small inner rect and 'No Img' label
-                self.canvas.create_rectangle(px - 28, py - 14, px + 28, py + 14, fill='#121212', outline='white')
-                self.canvas.create_text(px, py, text='No Img', fill='white', font=('Helvetica', 9), tags=(f'avatar_{i}',))
+                self._put('avatars', f'noimg_box_{i}', 'rectangle', (px - 28, py - 14, px + 28, py + 14),
+                          fill='#121212', outline='white')
+                self._put('avatars', f'noimg_{i}', 'text', (px, py), text='No Img', fill='white',
+                          font=('Helvetica', 9), tags=(f'avatar_{i}',))
             # name label
-            self.canvas.create_text(px, py - avatar_h//2 - 8, text=player.name, fill='white', font=('Helvetica', 11, 'bold'), tags=(f'avatar_{i}',))
+            self._put('avatars', f'name_{i}', 'text', (px, py - avatar_h//2 - 8), text=player.name, fill='white',
+                      font=('Helvetica', 11, 'bold'), tags=(f'avatar_{i}',))
             # card count for bots
             if not player.is_human:
-                self.canvas.create_text(px, py + avatar_h//2 + 6, text=f'Cards: {len(player.hand)}', fill='white', tags=(f'avatar_{i}',))
+                self._put('avatars', f'count_{i}', 'text', (px, py + avatar_h//2 + 6),
+                          text=f'Cards: {len(player.hand)}', fill='white', tags=(f'avatar_{i}',))
             # highlight current player
             if i == self.current:
-                self.canvas.create_oval(px - avatar_w//2 - 6, py - avatar_h//2 - 6, px + avatar_w//2 + 6, py + avatar_h//2 + 6,
-                                       outline='yellow', width=3)
+                self._put('avatars', 'current', 'oval',
+                          (px - avatar_w//2 - 6, py - avatar_h//2 - 6, px + avatar_w//2 + 6, py + avatar_h//2 + 6),
+                          outline='yellow', width=3)
+        self._end_layer('avatars')
 
-        # hình ảnh bot cầm bài
-        self.draw_bot_hands()
-
-        # rút lá và huỷ
-        self.draw_deck()
-        self.draw_discard()
-
-        # mô tả bài
-        self.draw_card_description()
-
-        # thông tin lượt và chiều
-        try:
-            arrow = '↻' if self.direction == 1 else '↺'
-            turn_text = f"Turn: {self.players[self.current].name}  {arrow}"
-            self.canvas.create_text(self.center[0], self.center[1] + self.table_radius + 28,
-                                    text=turn_text, fill='white', font=('Helvetica', 12, 'bold'))
-        except Exception:
-            pass
+    def draw_background(self):
+        # nền tĩnh chỉ phụ thuộc kích thước canvas: vẽ một lần cho mỗi kích thước
+        if self._background_size == self._layout_size:
+            return
+        self._begin_layer('background')
+        self.draw_environment()
+        self.draw_table_surface(*self.center)
+        self._end_layer('background')
+        self._background_size = self._layout_size
 
     def draw_environment(self):
         # nền phòng với gradient dọc đơn giản
@@ -142,27 +458,26 @@ class UnoGUI:
         for i, c in enumerate(shades):
             y0 = i * stripe_h
             y1 = (i+1) * stripe_h
-            self.canvas.create_rectangle(0, y0, self.width, y1, fill=c, outline='')
+            self._put('background', f'stripe_{i}', 'rectangle', (0, y0, self.width, y1), fill=c, outline='')
         # sàn phía dưới
         floor_y0 = int(self.center[1] + self.table_radius + 70)
         if floor_y0 < self.height:
-            self.canvas.create_rectangle(0, floor_y0, self.width, self.height, fill='#1a1a1a', outline='')
+            self._put('background', 'floor', 'rectangle', (0, floor_y0, self.width, self.height), fill='#1a1a1a', outline='')
 
     def draw_table_surface(self, x, y):
         r = self.table_radius
         # bóng bàn
-        self.canvas.create_oval(x - r, y - r + 6, x + r, y + r + 6, fill='#141414', outline='')
+        self._put('background', 'shadow', 'oval', (x - r, y - r + 6, x + r, y + r + 6), fill='#141414', outline='')
         # viền gỗ nhiều lớp
-        self.canvas.create_oval(x - r, y - r, x + r, y + r, fill='#7b523b', outline='')
-        self.canvas.create_oval(x - r + 6, y - r + 6, x + r - 6, y + r - 6, fill='#6b452f', outline='')
-        self.canvas.create_oval(x - r + 12, y - r + 12, x + r - 12, y + r - 12, fill='#5e3b27', outline='')
+        self._put('background', 'wood_0', 'oval', (x - r, y - r, x + r, y + r), fill='#7b523b', outline='')
+        self._put('background', 'wood_1', 'oval', (x - r + 6, y - r + 6, x + r - 6, y + r - 6), fill='#6b452f', outline='')
+        self._put('background', 'wood_2', 'oval', (x - r + 12, y - r + 12, x + r - 12, y + r - 12), fill='#5e3b27', outline='')
         # mặt nỉ xanh ở giữa
         inner = max(40, r - 20)
-        self.canvas.create_oval(x - inner, y - inner, x + inner, y + inner, fill='#1e3b2b', outline='')
+        self._put('background', 'felt', 'oval', (x - inner, y - inner, x + inner, y + inner), fill='#1e3b2b', outline='')
 
     def draw_bot_hands(self):
-        if not self.players:
-            return
+        self._begin_layer('bot_hands')
         cx, cy = self.center
         for i, p in enumerate(self.players):
             if p.is_human:
@@ -172,7 +487,7 @@ class UnoGUI:
             ax = px + (cx - px) * 0.55
             ay = py + (cy - py) * 0.55
             # cánh tay
-            self.canvas.create_line(px, py, ax, ay, fill='#444', width=10)
+            self._put('bot_hands', f'arm_{i}', 'line', (px, py, ax, ay), fill='#444', width=10)
             # vẽ xòe lá úp
             card_count = len(p.hand)
             if card_count == 0:
@@ -186,172 +501,186 @@ class UnoGUI:
             for k in range(shown):
                 ox = ax + (k - mid) * spacing
                 oy = ay - abs(k - mid) * 2
-                # lớp nền và mặt sau lá bài
-                self.canvas.create_rectangle(ox - cw//2, oy - ch//2, ox + cw//2, oy + ch//2, fill='#111', outline='white', tags=('bot_hand',))
-                self.canvas.create_rectangle(ox - cw//2 + 3, oy - ch//2 + 3, ox + cw//2 - 3, oy + ch//2 - 3, fill='#333', outline='white', tags=('bot_hand',))
+                # lớp nền và mặt sau lá bài (một sprite)
+                self._put('bot_hands', f'back_{i}_{k}', 'image', (ox, oy),
+                          image=self.sprites.get(cw, ch, BOT_BACK), tags=('bot_hand',))
             # hiển thị tổng số
-            self.canvas.create_text(ax, ay + ch//2 + 12, text=f"{card_count} cards", fill='white', font=('Helvetica', 9))
-
-        # draw human hand at bottom each frame
-        try:
-            self.draw_hand(self.players[0])
-            # đảm bảo avatar và điều khiển nổi trên tay bài
-            for i in range(len(self.players)):
-                self.canvas.tag_raise(f'avatar_{i}')
-                self.canvas.tag_raise(f'avatar_img_{i}')
-            self.canvas.tag_raise('rename_btn')
-            self.canvas.tag_raise('uno_btn')
-        except Exception:
-            pass
+            self._put('bot_hands', f'total_{i}', 'text', (ax, ay + ch//2 + 12), text=f"{card_count} cards",
+                      fill='white', font=('Helvetica', 9))
+        self._end_layer('bot_hands')
 
     def draw_deck(self):
+        self._begin_layer('deck')
         x, y = self.deck_pos
         # chồng bài
         count = self.deck.count()
+        deck_img = self.sprites.get(self.card_width, self.card_height, DECK_CARD)
         for i in range(min(6, count)):
             offset = i * 1.5
-            self.canvas.create_rectangle(x - self.card_width/2 + offset, y - self.card_height/2 + offset,
-                                         x + self.card_width/2 + offset, y + self.card_height/2 + offset,
-                                         fill='#222', outline='white', tags=('deck',))
-        self.canvas.create_text(x, y + self.card_height/2 + 10, text=f'Deck: {count}', fill='white')
+            self._put('deck', f'stack_{i}', 'image', (x + offset, y + offset), image=deck_img, tags=('deck',))
+        self._put('deck', 'count', 'text', (x, y + self.card_height/2 + 10), text=f'Deck: {count}', fill='white')
         # rename button near deck
         bx = x - 40
         by = y + self.card_height/2 + 30
-        self.canvas.create_rectangle(bx-2, by-12, bx+82, by+12, fill='#333', outline='white', tags=('rename_btn',))
-        self.canvas.create_text(bx+40, by, text='Rename', fill='white', tags=('rename_btn',))
+        self._put('deck', 'rename_box', 'rectangle', (bx-2, by-12, bx+82, by+12), fill='#333', outline='white',
+                  tags=('rename_btn',))
+        self._put('deck', 'rename_text', 'text', (bx+40, by), text='Rename', fill='white', tags=('rename_btn',))
 
         # UNO button
         ubx = bx
         uby = by + 30
         uno_fill = '#2d5' if self.human_uno_called else '#333'
-        self.canvas.create_rectangle(ubx-2, uby-12, ubx+82, uby+12, fill=uno_fill, outline='white', tags=('uno_btn',))
-        self.canvas.create_text(ubx+40, uby, text='UNO!', fill='white', tags=('uno_btn',))
+        self._put('deck', 'uno_box', 'rectangle', (ubx-2, uby-12, ubx+82, uby+12), fill=uno_fill, outline='white',
+                  tags=('uno_btn',))
+        self._put('deck', 'uno_text', 'text', (ubx+40, uby), text='UNO!', fill='white', tags=('uno_btn',))
+        self._end_layer('deck')
 
     def draw_discard(self):
         # show the top discarded card in the center of the table
+        self._begin_layer('discard')
         x, y = self.center
         top = self.discard_pile[-1]
         color = self.tk_color_for(top.color)
         w = int(self.card_width * 1.2)
         h = int(self.card_height * 1.2)
-        # card shape with rounded corners look: layered rectangles
-        self.canvas.create_rectangle(x - w//2, y - h//2, x + w//2, y + h//2, fill='#111', outline='white', width=1)
-        self.canvas.create_rectangle(x - w//2 + 4, y - h//2 + 4, x + w//2 - 4, y + h//2 - 4, fill=color, outline='white', width=2)
+        # card shape with rounded corners look: layered rectangles (một sprite)
+        self._put('discard', 'card', 'image', (x, y), image=self.sprites.get(w, h, discard_layers(color)))
         # show only value/function + color label
-        display_text = getattr(top, 'value', str(top))
-        self.canvas.create_text(x, y, text=display_text, fill='white', font=('Helvetica', 16, 'bold'))
-        color_label = 'Any' if getattr(top, 'color', None) is None else top.color
-        self.canvas.create_text(x, y + h//2 + 12, text=f'Color: {color_label}', fill='white')
+        display_text = top.value
+        self._put('discard', 'value', 'text', (x, y), text=display_text, fill='white', font=('Helvetica', 16, 'bold'))
+        color_label = 'Any' if top.color is None else top.color
+        self._put('discard', 'color', 'text', (x, y + h//2 + 12), text=f'Color: {color_label}', fill='white')
+        self._end_layer('discard')
 
     def draw_hand(self, player):
         # rút bài
-        margin = 20
-        start_x = margin
-        y = self.height - self.card_height/2 - 30
-        # compute spacing to center hand if many cards
-        total_w = max(0, len(player.hand)-1) * (self.card_width - 30) + self.card_width
-        start_x = max(margin, (self.width - total_w)//2)
-        top = self.discard_pile[-1]
+        self._begin_layer('hand')
+        layout = self.hand_layout(self.hover_index)
+        mask = playable_mask(self.discard_pile[-1])
         is_human_turn = (self.players[self.current].is_human if self.players else False)
         for i, card in enumerate(player.hand):
             # if hovering over an index, slightly separate neighbors
-            base_x = start_x + i * (self.card_width - 30)
-            x = base_x
-            if self.hover_index is not None and self.hover_index == i:
-                # bring hovered card slightly up (visual)
-                hy_offset = -12
-            else:
-                hy_offset = 0
-            # spread others away a bit when hovering
-            if self.hover_index is not None and self.hover_index != i:
-                # push card left or right depending on side
-                dir_sign = 1 if i > self.hover_index else -1
-                x += dir_sign * 8
+            x, y = layout.centers[i]
             color = self.tk_color_for(card.color)
             tag = f'hand_{i}'
-            # layered look for each card
-            self.canvas.create_rectangle(x - self.card_width/2, y - self.card_height/2,
-                                         x + self.card_width/2, y + self.card_height/2,
-                                         fill='#111', outline='white', tags=(tag, 'hand'))
-            self.canvas.create_rectangle(x - self.card_width/2 + 3, y - self.card_height/2 + 3,
-                                         x + self.card_width/2 - 3, y + self.card_height/2 - 3,
-                                         fill=color, outline='white', tags=(tag, 'hand'))
+            # layered look for each card, highlight lá hợp lệ nếu là lượt của người chơi:
+            # tất cả nằm trong một sprite theo (màu, đánh được, đang chọn)
+            playable = bool(is_human_turn and (mask >> card.id) & 1)
+            img = self.sprites.get(self.card_width, self.card_height,
+                                   card_layers(color, playable, self.selected_index == i))
+            self._put('hand', f'{i}_card', 'image', (x, y), image=img, tags=(tag, 'hand'))
             # hiển thị giá trị và nhãn màu
-            value_text = getattr(card, 'value', str(card))
-            self.canvas.create_text(x, y+hy_offset-8, text=value_text, fill='white', font=('Helvetica', 12, 'bold'), tags=(tag,))
-            color_label = 'Wild' if getattr(card, 'color', None) is None else getattr(card, 'color', 'Any')
-            self.canvas.create_text(x, y+hy_offset+10, text=color_label, fill='#eeeeee', font=('Helvetica', 9), tags=(tag,))
-            # highlight lá hợp lệ nếu là lượt của người chơi
-            playable = (getattr(card, 'value', None) in ('Wild', 'Wild Draw Four') or
-                        card.color == getattr(top, 'color', None) or
-                        getattr(card, 'value', None) == getattr(top, 'value', None) or
-                        getattr(card, 'color', None) is None)
-            if is_human_turn and playable:
-                self.canvas.create_rectangle(x - self.card_width/2 - 3, y - self.card_height/2 - 3,
-                                             x + self.card_width/2 + 3, y + self.card_height/2 + 3,
-                                             outline='#00e0ff', width=2)
-            if self.selected_index == i:
-                self.canvas.create_rectangle(x - self.card_width/2 - 4, y - self.card_height/2 - 4,
-                                             x + self.card_width/2 + 4, y + self.card_height/2 + 4,
-                                             outline='yellow', width=3)
+            self._put('hand', f'{i}_value', 'text', (x, y-8), text=card.value, fill='white',
+                      font=('Helvetica', 12, 'bold'), tags=(tag,))
+            color_label = 'Wild' if card.color is None else card.color
+            self._put('hand', f'{i}_color', 'text', (x, y+10), text=color_label, fill='#eeeeee',
+                      font=('Helvetica', 9), tags=(tag,))
+        self._end_layer('hand')
 
-    def on_mouse_move(self, event):
-        # update hover_index based on mouse x/y near hand area
-        margin = 20
-        hy = self.height - self.card_height/2 - 30
-        if not (hy - self.card_height/2 - 10 <= event.y <= hy + self.card_height/2 + 10):
-            if self.hover_index is not None:
-                self.hover_index = None
-                self.draw_table()
+    def _move_card(self, i, dx, dy):
+        # dời cả nhóm item của lá thứ i bằng một lệnh move, giữ cache toạ độ khớp
+        self.canvas.move(f'hand_{i}', dx, dy)
+        items = self._layer_items.get('hand', {})
+        for part in CARD_PARTS:
+            entry = items.get(f'{i}_{part}')
+            if entry is not None:
+                entry[1] = tuple(v + (dx if k % 2 == 0 else dy) for k, v in enumerate(entry[1]))
+
+    def set_hover(self, index):
+        # chỉ các lá có độ lệch thay đổi mới bị dời (hover sang lá kề: 2 lá)
+        old = self.hover_index
+        if index == old:
+            return
+        self.hover_index = index
+        if 'hand' in self._dirty:
             return
-        # compute start_x as in draw_hand
-        total_w = max(0, len(self.players[0].hand)-1) * (self.card_width - 30) + self.card_width
-        start_x = max(margin, (self.width - total_w)//2)
-        # determine index
-        idx = None
         for i in range(len(self.players[0].hand)):
-            x = start_x + i * (self.card_width - 30)
-            if x - self.card_width/2 - 6 <= event.x <= x + self.card_width/2 + 6:
-                idx = i
-                break
-        if idx != self.hover_index:
-            self.hover_index = idx
-            self.draw_table()
+            ox, oy = hover_offset(i, old)
+            nx, ny = hover_offset(i, index)
+            if (ox, oy) != (nx, ny):
+                self._move_card(i, nx - ox, ny - oy)
+
+    def hit_index(self):
+        # dựng lại bảng hit-test khi kích thước hoặc số lá trên tay thay đổi
+        n = len(self.players[0].hand)
+        key = (self._layout_size, n)
+        if self._hit_index is not None and self._hit_index.key == key:
+            return self._hit_index
+        ch = self.card_height
+        rects = []
+        # avatar: khung + tên phía trên + số lá phía dưới
+        avatar_w, avatar_h = 110, 48
+        for i, (px, py) in enumerate(self.avatar_centers()):
+            rects.append((f'avatar_{i}', px - avatar_w//2, py - avatar_h//2 - 16, px + avatar_w//2, py + avatar_h//2 + 14))
+        dx, dy = self.deck_pos
+        rects.append(('deck', dx - 59, dy - 79, dx + 59, dy + 79))
+        bx = dx - 40
+        by = dy + ch/2 + 30
+        rects.append(('rename_btn', bx - 2, by - 12, bx + 82, by + 12))
+        rects.append(('uno_btn', bx - 2, by + 18, bx + 82, by + 42))
+        self._hit_index = HitIndex(key, self.hand_layout(None), rects)
+        return self._hit_index
+
+    def on_mouse_move(self, event):
+        # gộp các sự kiện <Motion>: xử lý hover tối đa một lần mỗi frame
+        self._pointer = (event.x, event.y)
+        if self._hover_id is None:
+            self._pointer_time = time.perf_counter()
+            self._hover_id = self.root.after(FRAME_MS, self._process_hover)
+
+    def _process_hover(self):
+        # update hover_index based on mouse x/y near hand area
+        self._hover_id = None
+        x, y = self._pointer
+        if self.perf is not None:
+            self.perf.add('hover_delay', (time.perf_counter() - self._pointer_time) * 1000)
+        self.set_hover(self.hit_index().hand_index(x, y, padx=6, pady=10))
 
     def on_resize(self, event):
-        # chỉnh kích cỡ thu phóng cửa sổ
-        try:
-            self.width = event.width
-            self.height = event.height
-        except Exception:
-            self.width = max(self.canvas.winfo_width(), self.width)
-            self.height = max(self.canvas.winfo_height(), self.height)
-        self.draw_table()
+        # chỉnh kích cỡ thu phóng cửa sổ; <Configure> cũng bắn khi kích thước không đổi
+        size = (event.width, event.height)
+        if size == self._canvas_size:
+            return
+        self._canvas_size = size
+        self.invalidate()
 
     def draw_card_description(self):
         # panel
+        self._begin_layer('info')
         w = 260
         h = 140
         x = self.width - w - 20
         y = self.height - h - 20
-        self.canvas.create_rectangle(x, y, x + w, y + h, fill='#111', outline='white')
-        self.canvas.create_text(x + 10, y + 10, anchor='nw', text='Card Info', fill='white', font=('Helvetica', 12, 'bold'))
+        self._put('info', 'panel', 'rectangle', (x, y, x + w, y + h), fill='#111', outline='white')
+        self._put('info', 'title', 'text', (x + 10, y + 10), anchor='nw', text='Card Info', fill='white',
+                  font=('Helvetica', 12, 'bold'))
         if self.selected_index is not None and len(self.players[0].hand) > self.selected_index:
             c = self.players[0].hand[self.selected_index]
-            self.canvas.create_text(x + 10, y + 40, anchor='nw', text=f'Name: {str(c)}', fill='white')
+            self._put('info', 'line1', 'text', (x + 10, y + 40), anchor='nw', text=f'Name: {str(c)}', fill='white')
             desc = self.describe_card(c)
-            self.canvas.create_text(x + 10, y + 70, anchor='nw', text=desc, fill='white', width=w-20)
+            self._put('info', 'line2', 'text', (x + 10, y + 70), anchor='nw', text=desc, fill='white', width=w-20)
         else:
-            self.canvas.create_text(x + 10, y + 40, anchor='nw', text='Select a card to see details', fill='white')
+            self._put('info', 'line1', 'text', (x + 10, y + 40), anchor='nw', text='Select a card to see details',
+                      fill='white')
+        self._end_layer('info')
+
+    def draw_turn_info(self):
+        # thông tin lượt và chiều
+        self._begin_layer('turn')
+        arrow = '↻' if self.direction == 1 else '↺'
+        turn_text = f"Turn: {self.players[self.current].name}  {arrow}"
+        self._put('turn', 'text', 'text', (self.center[0], self.center[1] + self.table_radius + 28),
+                  text=turn_text, fill='white', font=('Helvetica', 12, 'bold'))
+        self._end_layer('turn')
+
+    def hand_layout(self, hover):
+        return hand_layout(self.width, self.height, self.card_width, self.card_height,
+                           len(self.players[0].hand), hover)
 
     def get_human_card_pos(self, index):
         # compute current human hand card center position for given index
-        margin = 20
-        total_w = max(0, len(self.players[0].hand)-1) * (self.card_width - 30) + self.card_width
-        start_x = max(margin, (self.width - total_w)//2)
-        x = start_x + index * (self.card_width - 30)
-        y = self.height - self.card_height/2 - 30
-        return (x, y)
+        layout = self.hand_layout(None)
+        return (layout.slot(index), layout.y)
 
     def tk_color_for(self, color):
         if color == 'Red':
@@ -381,61 +710,54 @@ class UnoGUI:
 
     def on_click(self, event):
         x, y = event.x, event.y
+        # đang chọn màu hoặc ván đã kết thúc: chỉ nhận click vào hộp chọn màu
+        if self._color_future is not None:
+            self._picker_click(x, y)
+            return
+        if self.engine.winner is not None:
+            return
+        index = self.hit_index()
+        target = index.hit(x, y)
         # check avatar clicks (rename individual player)
-        for i in range(len(self.players)):
-            bbox = self.canvas.bbox(f'avatar_{i}')
-            if bbox and bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]:
-                # set target and open rename dialog for that single player
-                self._rename_target = i
-                self.open_rename_dialog()
-                return
+        if target is not None and target.startswith('avatar_'):
+            # set target and open rename dialog for that single player
+            self._rename_target = int(target[len('avatar_'):])
+            self.open_rename_dialog()
+            return
         # check deck
-        dx, dy = self.deck_pos
-        if abs(x - dx) < 60 and abs(y - dy) < 80:
+        if target == 'deck':
             # chỉ rút khi đến lượt người chơi
-            if self.players[self.current].is_human:
+            if self.waiting_for_human():
                 self.player_draw()
             return
 
-        # kiểm tra bài trên tay
-        # tính toán vị trí giống draw_hand để bắt chuẩn xác
-        margin = 20
-        total_w = max(0, len(self.players[0].hand)-1) * (self.card_width - 30) + self.card_width
-        start_x = max(margin, (self.width - total_w)//2)
-        hy = self.height - self.card_height/2 - 30
-        for i, card in enumerate(self.players[0].hand):
-            hx = start_x + i * (self.card_width - 30)
-            if hx - self.card_width/2 < x < hx + self.card_width/2 and hy - self.card_height/2 < y < hy + self.card_height/2:
-                # select or play
-                if self.selected_index == i:
-                    # chỉ được đánh khi đến lượt người chơi
-                    if self.players[self.current].is_human:
-                        # animate playing from hand to center then apply play
-                        self.animate_play_from_hand(i)
-                else:
-                    self.selected_index = i
-                    self.draw_table()
-                return
+        # kiểm tra bài trên tay (cùng vị trí với draw_hand)
+        i = index.hand_index(x, y)
+        if i is not None:
+            # select or play
+            if self.selected_index == i:
+                # chỉ được đánh khi đến lượt người chơi
+                if self.waiting_for_human():
+                    # animate playing from hand to center then apply play
+                    self.animate_play_from_hand(i)
+            else:
+                self.selected_index = i
+                self.invalidate('hand', 'info')
+            return
 
         # check rename button
-        items = self.canvas.find_withtag('rename_btn')
-        for it in items:
-            bbox = self.canvas.bbox(it)
-            if bbox and bbox[0] <= event.x <= bbox[2] and bbox[1] <= event.y <= bbox[3]:
-                self.open_rename_dialog()
-                return
+        if target == 'rename_btn':
+            self.open_rename_dialog()
+            return
 
         # check UNO button
-        items = self.canvas.find_withtag('uno_btn')
-        for it in items:
-            bbox = self.canvas.bbox(it)
-            if bbox and bbox[0] <= event.x <= bbox[2] and bbox[1] <= event.y <= bbox[3]:
-                # người chơi tuyên bố UNO (sẽ có hiệu lực khi còn 1 lá)
-                if self.players[self.current].is_human:
-                    self.human_uno_called = True
-                    self.draw_table()
-                    messagebox.showinfo('UNO', 'Bạn đã sẵn sàng hô UNO!')
-                return
+        if target == 'uno_btn':
+            # người chơi tuyên bố UNO (sẽ có hiệu lực khi còn 1 lá)
+            if self.waiting_for_human():
+                self.human_uno_called = True
+                self.refresh()
+                self.notify('UNO', 'Bạn đã sẵn sàng hô UNO!')
+            return
 
     def on_double_click(self, event):
         # nháy đúp vào lá bài ở giữa để mở hộp đổi tên
@@ -446,122 +768,165 @@ class UnoGUI:
         if (cx - w//2) <= x <= (cx + w//2) and (cy - h//2) <= y <= (cy + h//2):
             self.open_rename_dialog()
 
+    # --- thông báo và hộp chọn màu vẽ ngay trên canvas, không chặn vòng lặp Tk ---
+    def notify(self, title, text, ms=2000):
+        # toast ở giữa phía trên; giữ tối đa 3 dòng mới nhất, mỗi dòng tự tắt sau ms
+        line = [f'{title}: {text}' if title else text]
+        self._toasts.append(line)
+        del self._toasts[:-3]
+
+        def expire():
+            if line in self._toasts:
+                self._toasts.remove(line)
+                self.invalidate('toast')
+        self.root.after(ms, expire)
+        self.invalidate('toast')
+
+    def draw_toasts(self):
+        self._begin_layer('toast')
+        x = self.width // 2
+        for k, (text,) in enumerate(self._toasts):
+            y = 28 + k * 30
+            self._put('toast', f'box_{k}', 'rectangle', (x - 190, y - 12, x + 190, y + 12),
+                      fill='#111', outline='#00e0ff')
+            self._put('toast', f'text_{k}', 'text', (x, y), text=text, fill='white', font=('Helvetica', 11))
+        self._end_layer('toast')
+
+    # --- số đo hiệu năng (perf.py) ---
+    def _timed(self, name, handler):
+        return handler if self.perf is None else self.perf.wrap(name, handler)
+
+    def toggle_perf_overlay(self):
+        self._perf_overlay = not self._perf_overlay
+        self.invalidate('perf')
+
+    def _perf_tick(self):
+        if self._perf_overlay:
+            self.invalidate('perf')
+        self.root.after(PERF_OVERLAY_MS, self._perf_tick)
+
+    def draw_perf_overlay(self):
+        self._begin_layer('perf')
+        if self._perf_overlay:
+            lines = self.perf.lines()
+            width = 7 * max(len(line) for line in lines)
+            self._put('perf', 'box', 'rectangle', (8, 8, 20 + width, 16 + 15 * len(lines)), fill='#000',
+                      outline='#444', stipple='gray50')
+            self._put('perf', 'text', 'text', (14, 12), anchor='nw', text='\n'.join(lines), fill='#0f0',
+                      font=('Courier', 9))
+        self._end_layer('perf')
+
     def ask_color_choice(self):
-        # modal dialog to choose a color for Wild cards
-        dlg = tk.Toplevel(self.root)
-        dlg.title('Choose color')
-        dlg.transient(self.root)
-        dlg.grab_set()
-        choice = {'color': None}
-
-        def pick(c):
-            choice['color'] = c
-            dlg.destroy()
-
-        tk.Label(dlg, text='Choose color for Wild:', font=('Helvetica', 12)).pack(padx=10, pady=8)
-        frm = tk.Frame(dlg)
-        frm.pack(padx=10, pady=8)
-        for c in COLORS:
-            b = tk.Button(frm, text=c, bg=self.tk_color_for(c), command=lambda cc=c: pick(cc), width=10)
-            b.pack(side='left', padx=4)
-
-        self.root.wait_window(dlg)
-        return choice['color']
+        # chọn màu cho lá Wild; trả về Future, có kết quả khi người chơi click một màu
+        self._color_future = Future()
+        self.invalidate('picker')
+        return self._color_future
+
+    def draw_color_picker(self):
+        self._begin_layer('picker')
+        self._picker_rects = []
+        if self._color_future is not None:
+            cx, cy = self.center
+            sw = 70
+            total = len(COLORS) * (sw + 10) + 10
+            x0 = cx - total // 2
+            self._put('picker', 'panel', 'rectangle', (x0, cy - 60, x0 + total, cy + 50), fill='#111', outline='white')
+            self._put('picker', 'title', 'text', (cx, cy - 40), text='Choose color for Wild:', fill='white',
+                      font=('Helvetica', 12))
+            for k, c in enumerate(COLORS):
+                rect = (x0 + 10 + k * (sw + 10), cy - 20, x0 + 10 + k * (sw + 10) + sw, cy + 36)
+                self._put('picker', f'swatch_{k}', 'rectangle', rect, fill=self.tk_color_for(c), outline='white')
+                self._put('picker', f'label_{k}', 'text', ((rect[0] + rect[2]) / 2, cy + 8), text=c, fill='white')
+                self._picker_rects.append((c, rect))
+        self._end_layer('picker')
+
+    def _picker_click(self, x, y):
+        for color, (x0, y0, x1, y1) in self._picker_rects:
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                future, self._color_future = self._color_future, None
+                self.invalidate('picker')
+                future.set_result(color)
+                return
 
     def attempt_play(self, index):
+        # lượt đã kết thúc (vd. click lần hai trong lúc animation đang chạy)
+        if not self.waiting_for_human():
+            return
         player = self.players[0]
         card = player.hand[index]
-        top = self.discard_pile[-1]
-        if (card.value in ('Wild', 'Wild Draw Four') or card.color == top.color or card.value == top.value or card.color is None):
-            played = player.hand.pop(index)
-            # if human plays a wild, ask for color
-            if played.color is None and played.value in ('Wild', 'Wild Draw Four') and player.is_human:
-                chosen = self.ask_color_choice()
-                if chosen:
-                    played.color = chosen
-            self.discard_pile.append(played)
-            self.selected_index = None
-            # hiệu ứng
-            if played.value == 'Reverse':
-                self.direction *= -1
-            elif played.value == 'Skip':
-                self.next_player()
-            elif played.value == 'Draw Two':
-                self.next_player()
-                self.players[self.current].draw(self.deck, 2)
-            elif played.value == 'Wild Draw Four':
-                self.next_player()
-                self.players[self.current].draw(self.deck, 4)
-
-            # xử lý UNO: người chơi cần nhấn nút trước khi kết thúc lượt
-            if player.has_uno():
-                if player.is_human:
-                    if self.human_uno_called:
-                        messagebox.showinfo('UNO', f'{player.name} says UNO!')
-                        self.human_uno_called = False
-                        self.pending_uno_penalty_index = None
-                    else:
-                        # sẽ bị phạt +2 khi tới lượt kế tiếp bắt đầu
-                        self.pending_uno_penalty_index = 0
-                else:
-                    messagebox.showinfo('UNO', f'{player.name} says UNO!')
-            if player.is_winner():
-                messagebox.showinfo('Winner', f'{player.name} wins!')
-                self.root.quit()
-            self.next_player()
-            self.draw_table()
-            self.root.after(400, self.ai_turn_if_needed)
+        if self.engine.is_playable(card):
+            # if human plays a wild, ask for color (không chặn: chơi tiếp khi đã chọn)
+            if card.color is None and card.value in SPECIALS and player.is_human:
+                self.ask_color_choice().add_done_callback(lambda color: self.finish_human_play(index, color))
+            else:
+                self.finish_human_play(index, None)
         else:
-            messagebox.showinfo('Cannot play', 'This card cannot be played on the top card.')
+            self.notify('Cannot play', 'This card cannot be played on the top card.')
+
+    def finish_human_play(self, index, chosen):
+        player = self.players[0]
+        self.selected_index = None
+        if self.remote is not None:
+            self.remote.play(player.hand[index].id, chosen)
+            return
+        self.engine.play_card(index, chosen)
+
+        # xử lý UNO: người chơi cần nhấn nút trước khi kết thúc lượt
+        if player.has_uno() and self.pending_uno_penalty_index is None:
+            self.notify('UNO', f'{player.name} says UNO!')
+        self.invalidate('hand', 'info')
+        self.refresh()
+        self.end_human_turn(400)
+
+    def announce_winner(self, player):
+        # để toast hiện một lúc rồi mới thoát
+        self.notify('Winner', f'{player.name} wins!', ms=3000)
+        self._quit_id = self.root.after(3000, self.root.quit)
 
     def player_draw(self):
         player = self.players[0]
-        if self.deck.count() == 0:
-            self.reshuffle_discard_into_deck()
-        card = self.deck.draw()
+        if self.remote is not None:
+            self.animate_draw_from_deck(to_hand_index=len(player.hand))
+            self.remote.draw()
+            return
+        card = self.engine.draw_card(0)
         if card:
             # animate deck->hand then add
             self.animate_draw_from_deck(to_hand_index=len(player.hand))
             player.hand.append(card)
             # nếu lá rút đánh được, tự động chọn để người chơi có thể click chơi ngay
-            top = self.discard_pile[-1]
-            if (getattr(card, 'value', None) in ('Wild', 'Wild Draw Four') or
-                getattr(card, 'color', None) == getattr(top, 'color', None) or
-                getattr(card, 'value', None) == getattr(top, 'value', None) or
-                getattr(card, 'color', None) is None):
+            if self.engine.is_playable(card):
                 self.selected_index = len(player.hand) - 1
                 # người chơi có thể bấm để đánh; chưa kết thúc lượt
             else:
                 self.selected_index = None
                 # không đánh được -> kết thúc lượt ngay
-                self.draw_table()
-                self.next_player()
-                self.root.after(600, self.ai_turn_if_needed)
+                self.engine.pass_turn()
+                self.refresh()
+                self.end_human_turn(600)
                 return
-            self.draw_table()
+            self.refresh()
         else:
-            messagebox.showinfo('Deck empty', 'No cards to draw.')
+            self.notify('Deck empty', 'No cards to draw.')
 
     def animate_move(self, src, dst, color='#fff', text='', steps=12, callback=None):
         # src/dst are (x,y) centers. Draw a temporary rect and move it.
+        # mọi animation chạy chung một FrameClock; steps giữ nghĩa cũ (số frame 16 ms)
         sx, sy = src
         dx, dy = dst
-        rect = self.canvas.create_rectangle(sx-20, sy-30, sx+20, sy+30, fill=color, outline='white')
-        label = self.canvas.create_text(sx, sy, text=text, fill='white')
-        def step(i):
-            t = (i+1)/steps
+        rect = self.canvas.create_rectangle(sx-20, sy-30, sx+20, sy+30, fill=color, outline='white', tags=('anim',))
+        label = self.canvas.create_text(sx, sy, text=text, fill='white', tags=('anim',))
+        def update(t):
             nx = sx + (dx-sx)*t
             ny = sy + (dy-sy)*t
             self.canvas.coords(rect, nx-20, ny-30, nx+20, ny+30)
             self.canvas.coords(label, nx, ny)
-            if i+1 < steps:
-                self.root.after(16, lambda: step(i+1))
-            else:
-                self.canvas.delete(rect)
-                self.canvas.delete(label)
-                if callback:
-                    callback()
-        step(0)
+        def done():
+            self.canvas.delete(rect)
+            self.canvas.delete(label)
+            if callback:
+                callback()
+        return self.clock.animate(steps * FRAME_MS, update, on_done=done)
 
     def animate_play_from_hand(self, hand_index):
         # compute hand card pos
@@ -608,7 +973,7 @@ class UnoGUI:
                 for i, e in enumerate(entries):
                     self.players[i].name = e.get() or self.players[i].name
                 dlg.destroy()
-                self.draw_table()
+                self.refresh()
             tk.Button(dlg, text='Apply', command=apply_names).grid(row=len(entries), column=0, columnspan=2, pady=8)
 
         # allow external callers to pass player_index
@@ -629,7 +994,7 @@ class UnoGUI:
                 self.players[i].name = e.get() or self.players[i].name
                 dlg.destroy()
                 delattr(self, '_rename_target')
-                self.draw_table()
+                self.refresh()
             def set_avatar():
                 path = filedialog.askopenfilename(title='Select avatar image', filetypes=[('Images','*.png *.gif *.ppm *.pgm')])
                 if not path:
@@ -644,7 +1009,7 @@ class UnoGUI:
                     if factor > 1:
                         img = img.subsample(factor, factor)
                     self.avatar_images[i] = img
-                    self.draw_table()
+                    self.invalidate('avatars')
                 except Exception as ex:
                     messagebox.showerror('Image error', f'Could not load image: {ex}')
 
@@ -654,106 +1019,113 @@ class UnoGUI:
             _open_all()
 
     def next_player(self):
-        self.current = (self.current + self.direction) % len(self.players)
+        self.engine.next_player()
 
     def apply_uno_penalty_if_pending(self):
         # áp dụng phạt +2 nếu người chơi quên hô UNO
-        if self.pending_uno_penalty_index is None:
+        idx = self.engine.apply_uno_penalty_if_pending()
+        if idx is None:
+            return
+        self.notify('UNO penalty', f"{self.players[idx].name} quên hô UNO: +2")
+
+    def waiting_for_human(self):
+        if self.remote is not None:
+            return self.remote.my_turn()
+        return self._human_move is not None and not self._human_move.done
+
+    def end_human_turn(self, pause):
+        # báo cho turn_loop: người chơi đã xong lượt, nghỉ pause ms rồi sang người kế
+        if self.waiting_for_human():
+            self._human_move.set_result(pause)
+
+    def new_game(self, seed=None):
+        if self._quit_id is not None:
+            self.root.after_cancel(self._quit_id)
+            self._quit_id = None
+        if self.remote is not None:
+            self.selected_index = None
+            self.remote.new_game()
             return
-        idx = self.pending_uno_penalty_index
-        # đảm bảo có đủ bài để rút
-        if self.deck.count() < 2:
-            self.reshuffle_discard_into_deck()
-        # rút 2 lá cho người bị phạt
-        self.players[idx].draw(self.deck, 2)
-        try:
-            messagebox.showinfo('UNO penalty', f"{self.players[idx].name} quên hô UNO: +2")
-        except Exception:
-            pass
-        self.pending_uno_penalty_index = None
-        if idx == 0:
-            self.human_uno_called = False
-
-    def ai_turn_if_needed(self):
-        # áp dụng phạt UNO (nếu có) trước khi người kế tiếp hành động
-        self.apply_uno_penalty_if_pending()
-        # nếu người chơi hiện tại là AI
-        if self.players[self.current].is_human:
+        # huỷ lượt, bot đang nghĩ và animation của ván cũ rồi chia bài lại
+        self.turn_task.cancel()
+        self.ai_pool.cancel_all()
+        self.clock.cancel_all()
+        self.canvas.delete('anim')
+        if self._color_future is not None:
+            self._color_future = None
+            self.invalidate('picker')
+        self._human_move = None
+        self.selected_index = None
+        self.hover_index = None
+        names = [p.name for p in self.players]
+        self.engine = GameEngine(names, human_index=None if self.demo else 0, seed=seed, bot=self.bot, log=self.log)
+        self.invalidate()
+        self.turn_task = self.clock.spawn(self.turn_loop())
+
+    def on_remote_update(self, delta):
+        # delta từ server (client.TableClient), view đã được cập nhật; None = mất kết nối
+        if delta is None:
+            self.notify('Server', 'Disconnected', ms=5000)
             return
-        player = self.players[self.current]
-        top = self.discard_pile[-1]
-        card = player.play(top)
-        if card:
-            # if AI plays a wild, pick a random color for it
-            if card.color is None and card.value in ('Wild', 'Wild Draw Four'):
-                card.color = random.choice(COLORS)
-            self.discard_pile.append(card)
-            # hiệu ứng đơn giản
-            if card.value == 'Reverse':
-                self.direction *= -1
-            elif card.value == 'Skip':
-                self.next_player()
-            elif card.value == 'Draw Two':
-                self.next_player()
-                self.players[self.current].draw(self.deck, 2)
-            elif card.value == 'Wild Draw Four':
-                self.next_player()
-                self.players[self.current].draw(self.deck, 4)
-            if player.has_uno():
-                print(f'{player.name} says UNO!')
-            if player.is_winner():
-                messagebox.showinfo('Winner', f'{player.name} wins!')
-                self.root.quit()
-        else:
-            # không có lá hợp lệ, rút 1 lá và chơi nếu có thể
-            if self.deck.count() == 0:
-                self.reshuffle_discard_into_deck()
-            drawn = self.deck.draw()
-            if drawn is not None:
-                # nếu wild, sẽ chọn màu khi chơi
-                can_play = (drawn.color == top.color or drawn.value == top.value or drawn.color is None)
-                if can_play:
-                    if drawn.color is None and drawn.value in ('Wild', 'Wild Draw Four'):
-                        drawn.color = random.choice(COLORS)
-                    self.discard_pile.append(drawn)
-                    if drawn.value == 'Reverse':
-                        self.direction *= -1
-                    elif drawn.value == 'Skip':
-                        self.next_player()
-                    elif drawn.value == 'Draw Two':
-                        self.next_player()
-                        self.players[self.current].draw(self.deck, 2)
-                    elif drawn.value == 'Wild Draw Four':
-                        self.next_player()
-                        self.players[self.current].draw(self.deck, 4)
-                    if player.has_uno():
-                        print(f'{player.name} says UNO!')
-                    if player.is_winner():
-                        messagebox.showinfo('Winner', f'{player.name} wins!')
-                        self.root.quit()
-                else:
-                    # không chơi được -> thêm vào tay
-                    player.hand.append(drawn)
+        if 'note' in delta:
+            self.notify(*delta['note'])
+        if 'error' in delta:
+            self.notify('Server', delta['error'])
+        if 'drawn' in delta:
+            # lá vừa rút đánh được: chọn sẵn như khi chơi cục bộ
+            ids = [c.id for c in self.players[0].hand]
+            self.selected_index = ids.index(delta['drawn'])
+        elif 'hand' in delta:
+            self.selected_index = None
+        self.refresh()
+        if delta.get('winner') is not None:
+            self.announce_winner(self.players[delta['winner']])
+
+    def play_back(self, steps):
+        # phát lại ván từ log (eventlog.replay): thay engine của ván đang chơi
+        self.turn_task.cancel()
+        self.ai_pool.cancel_all()
+        self.turn_task = self.clock.spawn(self.replay_loop(steps))
+
+    def replay_loop(self, steps):
+        for engine in steps:
+            if engine is not self.engine:
+                self.engine = engine
+                self.invalidate()
+            self.refresh()
+            yield 600
+        if self.engine.winner is not None:
+            self.notify('Replay', f'{self.players[self.engine.winner].name} wins!', ms=5000)
+
+    def turn_loop(self):
+        # vòng lặp lượt duy nhất của ván: đến lượt người chơi thì chờ Future (không
+        # timer nào chạy), lượt AI thì đi rồi nghỉ một nhịp
+        yield 500
+        while True:
+            # áp dụng phạt UNO (nếu có) trước khi người kế tiếp hành động
+            self.apply_uno_penalty_if_pending()
+            player = self.players[self.current]
+            if player.is_human:
+                self._human_move = Future()
+                pause = yield self._human_move
+                self._human_move = None
             else:
-                # không còn bài để rút
-                pass
-        self.next_player()
-        self.draw_table()
-        # thiết lập nước đi của AI 
-        self.root.after(600, self.ai_turn_if_needed)
+                # bot nghĩ trên worker; thời gian nghĩ được trừ vào nhịp 600 ms giữa lượt
+                t0 = time.perf_counter()
+                think_ms = getattr(player, 'think_ms', None)
+                budget_ms = think_ms + AI_BUDGET_MARGIN_MS if think_ms else None
+                move = yield self.ai_pool.submit(player.decide, self.engine.snapshot(), first_legal_move, budget_ms)
+                if self.perf is not None:
+                    self.perf.add('ai_decision', (time.perf_counter() - t0) * 1000)
+                card = self.engine.apply_move(*move)
+                if card is not None and player.has_uno():
+                    self.notify('UNO', f'{player.name} says UNO!')
+                self.refresh()
+                pause = max(1, 600 - (time.perf_counter() - t0) * 1000)
+            if self.engine.winner is not None:
+                self.announce_winner(self.players[self.engine.winner])
+                return
+            yield pause
 
     def reshuffle_discard_into_deck(self):
-        if len(self.discard_pile) <= 1:
-            return
-        top = self.discard_pile.pop()
-        # reset màu cho wild trước khi trộn lại vào bộ
-        reset_cards = []
-        for c in self.discard_pile:
-            if getattr(c, 'value', None) in ('Wild', 'Wild Draw Four'):
-                # tạo lá mới với color None để tránh side-effect
-                reset_cards.append(type(c)(None, c.value))
-            else:
-                reset_cards.append(c)
-        self.deck.cards = reset_cards
-        random.shuffle(self.deck.cards)
-        self.discard_pile = [top]
\ No newline at end of file
+        self.engine.reshuffle_discard_into_deck()
@@ -0,0 +1,88 @@
+import json
+import os
+import time
+from collections import deque
+
+# bật đo: UNO_PERF=1, hoặc UNO_PERF=path.json để ghi kết quả khi thoát (hay --perf / --perf-out của uno.py)
+ENV = 'UNO_PERF'
+# số mẫu gần nhất giữ lại cho mỗi chỉ số
+WINDOW = 500
+PERCENTILES = (50, 90, 99)
+
+
+class Series:
+    def __init__(self, unit, window=WINDOW):
+        self.unit = unit
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+
+    def summary(self):
+        # percentile theo nearest-rank trên cửa sổ mẫu gần nhất
+        values = sorted(self.samples)
+        n = len(values)
+        result = {'unit': self.unit, 'count': self.count}
+        if n:
+            for p in PERCENTILES:
+                result[f'p{p}'] = values[min(n - 1, max(0, -(-p * n // 100) - 1))]
+            result['max'] = values[-1]
+        return result
+
+
+class Recorder:
+    # thu số đo của GUI; chỉ tạo khi bật đo, nơi gọi kiểm tra `perf is not None`
+    # nên khi tắt không tốn gì
+    def __init__(self, path=None, window=WINDOW):
+        self.path = path
+        self.window = window
+        self.series = {}
+        self.start = time.perf_counter()
+
+    def add(self, name, value, unit='ms'):
+        series = self.series.get(name)
+        if series is None:
+            series = self.series[name] = Series(unit, self.window)
+        series.add(value)
+
+    def wrap(self, name, fn):
+        # fn được đo thời gian mỗi lần gọi (vd. handler sự kiện Tk)
+        def timed(*args, **kw):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kw)
+            finally:
+                self.add(name, (time.perf_counter() - t0) * 1000)
+        return timed
+
+    def summary(self):
+        return {name: series.summary() for name, series in sorted(self.series.items())}
+
+    def lines(self):
+        # bảng cho overlay trên canvas
+        out = [f'{"metric":<14}' + ''.join(f'{"p" + str(p):>7}' for p in PERCENTILES) + f'{"max":>7}']
+        for name, s in self.summary().items():
+            if 'max' in s:
+                values = [s[f'p{p}'] for p in PERCENTILES] + [s['max']]
+                out.append(f'{name:<14}' + ''.join(f'{v:>7.1f}' for v in values) + f' {s["unit"]}')
+        return out
+
+    def dump(self, path=None):
+        path = path or self.path
+        with open(path, 'w') as f:
+            json.dump({'seconds': time.perf_counter() - self.start, 'window': self.window,
+                       'metrics': self.summary()}, f, indent=2)
+            f.write('\n')
+
+    def close(self):
+        if self.path:
+            self.dump()
+
+
+def from_env():
+    value = os.environ.get(ENV, '')
+    if value in ('', '0'):
+        return None
+    return Recorder(None if value == '1' else value)
@@ -0,0 +1,171 @@
+import time
+
+# tốc độ vô hạn: tween kết thúc ngay, delay chỉ còn 1 ms
+INSTANT = float('inf')
+
+
+def linear(t):
+    return t
+
+
+def ease_out_cubic(t):
+    return 1 - (1 - t) ** 3
+
+
+def ease_in_out(t):
+    return 3 * t * t - 2 * t * t * t
+
+
+class Tween:
+    def __init__(self, duration, update, easing, on_done):
+        self.duration = duration
+        self.update = update
+        self.easing = easing
+        self.on_done = on_done
+        self.elapsed = 0.0
+        self.finished = False
+        # xong khi tween chạy hết (không xong nếu bị huỷ)
+        self.done = Future()
+
+    def cancel(self):
+        # huỷ giữa chừng: không gọi update/on_done nữa
+        self.finished = True
+
+
+class FrameClock:
+    # một timer after() duy nhất chạy mọi tween đang hoạt động; timer tự dừng khi
+    # không còn tween nào. speed nhân tốc độ cho cả animation lẫn delay giữa lượt
+    def __init__(self, root, frame_ms=16, speed=1.0):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.speed = speed
+        self.tweens = []
+        self._after_id = None
+        self._last = None
+        # perf.Recorder: độ lệch của mỗi frame so với frame_ms
+        self.perf = None
+
+    def scaled(self, ms):
+        if self.speed == INSTANT:
+            return 0
+        return ms / self.speed
+
+    def animate(self, duration_ms, update, easing=ease_out_cubic, on_done=None):
+        tween = Tween(self.scaled(duration_ms), update, easing, on_done)
+        if tween.duration <= 0:
+            self._finish(tween)
+            return tween
+        self.tweens.append(tween)
+        if self._after_id is None:
+            self._last = time.perf_counter()
+            self._after_id = self.root.after(self.frame_ms, self._tick)
+        return tween
+
+    def delay(self, ms, callback):
+        # delay giữa các lượt cũng theo speed; tối thiểu 1 ms để Tk kịp vẽ
+        return self.root.after(max(1, int(self.scaled(ms))), callback)
+
+    def cancel_all(self):
+        for tween in self.tweens:
+            tween.cancel()
+        self.tweens = []
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def spawn(self, gen):
+        # chạy generator như một coroutine trên vòng lặp Tk (xem Task)
+        return Task(self, gen)
+
+    def _finish(self, tween):
+        tween.finished = True
+        tween.update(1.0)
+        if tween.on_done:
+            tween.on_done()
+        tween.done.set_result()
+
+    def _tick(self):
+        now = time.perf_counter()
+        dt = (now - self._last) * 1000
+        self._last = now
+        if self.perf is not None:
+            self.perf.add('frame_jitter', dt - self.frame_ms)
+        # tween mới có thể được thêm trong on_done, chúng bắt đầu từ frame sau
+        current, self.tweens = self.tweens, []
+        for tween in current:
+            if tween.finished:
+                continue
+            tween.elapsed += dt
+            if tween.elapsed >= tween.duration:
+                self._finish(tween)
+            else:
+                tween.update(tween.easing(tween.elapsed / tween.duration))
+                self.tweens.append(tween)
+        if self.tweens:
+            self._after_id = self.root.after(self.frame_ms, self._tick)
+        else:
+            self._after_id = None
+
+
+class Future:
+    # kết quả sẽ có sau (người chơi chọn màu, animation xong...), báo qua callback
+    def __init__(self):
+        self.done = False
+        self.result = None
+        self._callbacks = []
+
+    def set_result(self, value=None):
+        if self.done:
+            return
+        self.done = True
+        self.result = value
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(value)
+
+    def add_done_callback(self, callback):
+        if self.done:
+            callback(self.result)
+        else:
+            self._callbacks.append(callback)
+
+
+class Task:
+    # coroutine hợp tác trên vòng lặp Tk: generator yield số ms để ngủ (theo speed
+    # của clock) hoặc một Future để chờ kết quả, giá trị Future được gửi lại vào
+    # generator. Khi đang chờ Future không có timer nào chạy.
+    def __init__(self, clock, gen):
+        self.clock = clock
+        self.gen = gen
+        self.done = Future()
+        self.cancelled = False
+        self._after_id = None
+        self._step(None)
+
+    def cancel(self):
+        if self.cancelled or self.done.done:
+            return
+        self.cancelled = True
+        if self._after_id is not None:
+            self.clock.root.after_cancel(self._after_id)
+            self._after_id = None
+        self.gen.close()
+
+    def _step(self, value):
+        self._after_id = None
+        if self.cancelled:
+            return
+        try:
+            waited = self.gen.send(value)
+        except StopIteration as stop:
+            self.done.set_result(stop.value)
+            return
+        if isinstance(waited, Future):
+            waited.add_done_callback(self._resume)
+        else:
+            self._after_id = self.clock.delay(waited, lambda: self._step(None))
+
+    def _resume(self, value):
+        # tiếp tục ở lượt idle sau, không chạy lồng trong callback của Future
+        if not self.cancelled:
+            self._after_id = self.clock.root.after_idle(lambda: self._step(value))
@@ -0,0 +1,318 @@
+import asyncio
+import json
+import random
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from game import GameEngine, Player, COLORS, COLOR_INDEX, split_seed
+
+# giao thức: mỗi dòng một object JSON.
+# client -> server: {"op": "join", "name": "You"}  (mở bàn mới, ngồi ghế 0)
+#                   {"op": "play", "card": <id>, "color": "Red"|null}, {"op": "draw"},
+#                   {"op": "uno"}, {"op": "new"}
+# server -> client: chỉ các khoá của view đã đổi so với lần gửi trước:
+#   names, seat, hand (id bài của mình), sizes, top [id, chỉ số màu], deck, cur, dir, uno, winner
+#   và các khoá một lần: note [tiêu đề, nội dung], drawn (id lá vừa rút đánh được), error
+TURN_MS = 600
+# nghỉ sau lượt của người chơi (như GUI chạy cục bộ)
+PLAY_PAUSE_MS = 400
+PASS_PAUSE_MS = 600
+MAX_TURNS = 5000
+# thống kê in ra mỗi chừng này giây (uno.py server --stats)
+STATS_S = 5
+
+
+# bot của các bàn sống trong process worker (giữ cây tìm kiếm và rng giữa các lượt):
+# table id -> (số thứ tự ván, {ghế: bot}). Mỗi bàn luôn dùng cùng một worker
+_worker_bots = {}
+
+
+def worker_decide(table_id, game, seat, bot, snapshot):
+    # chạy trong process worker; bot chỉ được gửi sang ở lượt đầu của ghế trong ván
+    entry = _worker_bots.get(table_id)
+    if entry is None or entry[0] != game:
+        entry = _worker_bots[table_id] = (game, {})
+    if bot is not None:
+        entry[1][seat] = bot
+    return entry[1][seat].decide(snapshot)
+
+
+def worker_release(table_id):
+    _worker_bots.pop(table_id, None)
+
+
+def table_view(engine, seat):
+    # những gì người ngồi ghế seat được thấy
+    top = engine.discard_pile[-1]
+    return {
+        'names': [p.name for p in engine.players],
+        'seat': seat,
+        'hand': [c.id for c in engine.players[seat].hand],
+        'sizes': [len(p.hand) for p in engine.players],
+        'top': [top.id, COLOR_INDEX[top.color]],
+        'deck': engine.deck.count(),
+        'cur': engine.current,
+        'dir': engine.direction,
+        'uno': engine.human_uno_called,
+        'winner': engine.winner,
+    }
+
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.name = 'You'
+        self.table = None
+        # view đã gửi lần trước, để chỉ gửi phần thay đổi
+        self.sent = {}
+
+    def send(self, msg):
+        self.writer.write(json.dumps(msg, separators=(',', ':')).encode() + b'\n')
+
+    def send_view(self, view, extra=None):
+        delta = {k: v for k, v in view.items() if self.sent.get(k) != v}
+        self.sent = view
+        if extra:
+            delta.update(extra)
+        if delta:
+            self.send(delta)
+
+
+class Table:
+    # một ván đang chạy: một task asyncio đi lần lượt từng lượt; bot đi ngay (hoặc
+    # trên process worker của bàn nếu bot phải suy nghĩ), ghế người chơi chờ lệnh trong queue
+    def __init__(self, server, table_id, client=None):
+        self.server = server
+        self.id = table_id
+        self.client = client
+        self.moves = asyncio.Queue()
+        self.games = 0
+        self._extra = {}
+        self.engine = None
+        self.task = None
+        # process worker của bàn (None: bot đi ngay trên vòng lặp) và các ghế đã gửi bot sang đó
+        self.executor = server.executors[table_id % len(server.executors)] if server.executors else None
+        self.shipped = set()
+        self.start()
+
+    def start(self):
+        # (chơi lại) ván mới; huỷ lượt đang chờ của ván cũ
+        if self.task is not None:
+            self.task.cancel()
+        self.deal()
+        self.moves = asyncio.Queue()
+        self.push()
+        self.task = asyncio.create_task(self.run())
+        self.task.add_done_callback(self._task_done)
+
+    def _task_done(self, task):
+        # lỗi trong ván (bug luật chơi...): ghi traceback và đóng bàn, không để client chờ mãi
+        if task.cancelled() or task.exception() is None:
+            return
+        ex = task.exception()
+        print(f'table {self.id} crashed:', file=sys.stderr)
+        traceback.print_exception(type(ex), ex, ex.__traceback__, file=sys.stderr)
+        if self.client is not None:
+            self.client.send({'error': 'table crashed'})
+            self.client.writer.close()
+        self.server.close_table(self)
+
+    def deal(self):
+        names = [f'Bot {i+1}' for i in range(4)]
+        if self.client is not None:
+            names[0] = self.client.name
+        self.games += 1
+        self.shipped = set()
+        self.engine = GameEngine(names, human_index=0 if self.client is not None else None,
+                                 seed=split_seed(self.server.seed, self.id * 2**20 + self.games), bot=self.server.bot)
+
+    def note(self, title, text):
+        self._extra['note'] = [title, text]
+
+    def push(self):
+        if self.client is not None:
+            self.client.send_view(table_view(self.engine, 0), self._extra)
+        self._extra = {}
+
+    async def run(self):
+        while True:
+            await self.play()
+            if self.client is not None:
+                # người chơi bấm ván mới (op 'new') khi muốn
+                return
+            # bàn chỉ có bot (tải giả lập): chơi ván mới ngay
+            self.deal()
+
+    async def play(self):
+        engine = self.engine
+        await asyncio.sleep(self.server.scaled(500))
+        while engine.winner is None and engine.turns < MAX_TURNS:
+            idx = engine.apply_uno_penalty_if_pending()
+            if idx is not None:
+                self.note('UNO penalty', f'{engine.players[idx].name} quên hô UNO: +2')
+            player = engine.players[engine.current]
+            if player.is_human:
+                pause = await self.human_turn(player)
+            else:
+                card = await self.bot_turn(player)
+                if card is not None and player.has_uno():
+                    self.note('UNO', f'{player.name} says UNO!')
+                pause = TURN_MS
+            self.server.turns += 1
+            self.push()
+            await asyncio.sleep(self.server.scaled(pause))
+
+    async def bot_turn(self, player):
+        engine = self.engine
+        if self.executor is None:
+            if type(player) is Player:
+                return engine.ai_turn()
+            # --workers 0: bot phải suy nghĩ chạy ngay trên vòng lặp (chặn các bàn khác)
+            return engine.apply_move(*player.decide(engine.snapshot()))
+        loop = asyncio.get_running_loop()
+        seat = engine.current
+        bot = None if seat in self.shipped else player
+        self.shipped.add(seat)
+        move = await loop.run_in_executor(self.executor, worker_decide, self.id, self.games, seat, bot,
+                                          engine.snapshot())
+        return engine.apply_move(*move)
+
+    async def human_turn(self, player):
+        # trả về thời gian nghỉ sau lượt
+        engine = self.engine
+        while True:
+            msg = await self.moves.get()
+            op = msg.get('op')
+            if op == 'play':
+                card, color = msg.get('card'), msg.get('color')
+                if type(card) is not int or not (color is None or color in COLORS):
+                    self.client.send({'error': 'bad move'})
+                    continue
+                try:
+                    engine.apply_move(card, color)
+                except ValueError as ex:
+                    self.client.send({'error': str(ex)})
+                    continue
+                if player.has_uno() and engine.pending_uno_penalty_index is None:
+                    self.note('UNO', f'{player.name} says UNO!')
+                return PLAY_PAUSE_MS
+            if op == 'draw':
+                card = engine.draw_card(engine.current)
+                if card is None:
+                    # trả lời bằng error: client chờ 'hand' hoặc 'error' mới cho đi tiếp
+                    self.client.send({'error': 'Deck empty: no cards to draw.'})
+                    continue
+                player.hand.append(card)
+                if not engine.is_playable(card):
+                    engine.pass_turn()
+                    return PASS_PAUSE_MS
+                # lá rút đánh được: người chơi quyết định tiếp
+                self._extra['drawn'] = card.id
+                self.push()
+            elif op == 'uno':
+                engine.human_uno_called = True
+                self.push()
+
+    def close(self):
+        if self.task is not None:
+            self.task.cancel()
+        if self.executor is not None:
+            self.executor.submit(worker_release, self.id)
+
+
+class UnoServer:
+    def __init__(self, seed=None, speed=1.0, bot=Player, workers=0):
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.speed = speed
+        self.bot = bot
+        # bot phải suy nghĩ (ismcts) chạy trên các process worker để không chặn vòng lặp;
+        # mỗi worker một process để bàn nào cũng gặp lại bot của mình ở cùng process
+        self.executors = [ProcessPoolExecutor(max_workers=1) for _ in range(workers)]
+        self.tables = {}
+        self._next_id = 0
+        self.turns = 0
+
+    def scaled(self, ms):
+        return ms / 1000 / self.speed
+
+    def open_table(self, client=None):
+        self._next_id += 1
+        table = self.tables[self._next_id] = Table(self, self._next_id, client)
+        return table
+
+    def close_table(self, table):
+        table.close()
+        self.tables.pop(table.id, None)
+
+    async def handle(self, reader, writer):
+        conn = Connection(reader, writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    msg = None
+                if not isinstance(msg, dict):
+                    conn.send({'error': 'bad message'})
+                    continue
+                op = msg.get('op')
+                if op == 'join' and conn.table is None:
+                    conn.name = str(msg.get('name') or 'You')[:24]
+                    conn.table = self.open_table(conn)
+                elif conn.table is None:
+                    conn.send({'error': 'join first'})
+                elif op == 'new':
+                    conn.table.start()
+                else:
+                    conn.table.moves.put_nowait(msg)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if conn.table is not None:
+                self.close_table(conn.table)
+            writer.close()
+
+    async def report(self):
+        # resource chỉ có trên Unix: import ở đây để server vẫn chạy trên Windows
+        import resource
+        last_turns, last_wall, last_cpu = self.turns, time.perf_counter(), time.process_time()
+        while True:
+            await asyncio.sleep(STATS_S)
+            wall, cpu = time.perf_counter(), time.process_time()
+            rate = (self.turns - last_turns) / (wall - last_wall)
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            us = (cpu - last_cpu) / max(1, self.turns - last_turns) * 1e6
+            print(f'tables {len(self.tables)}  turns/s {rate:.0f}  CPU {(cpu - last_cpu) / (wall - last_wall):.0%}'
+                  f'  {us:.0f} us/turn  maxrss {rss:.0f} MB', flush=True)
+            last_turns, last_wall, last_cpu = self.turns, wall, cpu
+
+    async def serve(self, listen=None, unix=None, bot_tables=0, stats=False):
+        servers = []
+        if listen:
+            host, _, port = listen.rpartition(':')
+            servers.append(await asyncio.start_server(self.handle, host or '127.0.0.1', int(port)))
+        if unix:
+            servers.append(await asyncio.start_unix_server(self.handle, unix))
+        for _ in range(bot_tables):
+            self.open_table()
+        if stats:
+            asyncio.create_task(self.report())
+        for server in servers:
+            for sock in server.sockets:
+                print(f'listening on {sock.getsockname()}', flush=True)
+        await asyncio.gather(*(server.serve_forever() for server in servers), asyncio.Event().wait())
+
+
+def main(args, bot=Player):
+    server = UnoServer(seed=args.seed, speed=args.speed, bot=bot, workers=args.workers if bot is not Player else 0)
+    try:
+        asyncio.run(server.serve(args.listen, args.unix, args.tables, args.stats))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,122 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from eventlog import EventBuffer, EventLog
+from game import GameEngine, split_seed
+
+
+def play_one(seed, num_players=4, max_turns=5000, log=None):
+    # một ván bot headless -> (winner, số lượt, lá rút mỗi ghế, số lần trộn mỗi ghế)
+    engine = GameEngine([f'Bot {i+1}' for i in range(num_players)], seed=seed, log=log)
+    winner = engine.play_game(max_turns)
+    return (winner, engine.turns, engine.cards_drawn, engine.reshuffles)
+
+
+def run_chunk(base_seed, start, stop, num_players=4, max_turns=5000, log=False):
+    # chạy trong worker: ván thứ i luôn dùng split_seed(base_seed, i); log=True thì
+    # trả kèm bản ghi nhị phân của cả chunk để process chính nối vào file log
+    buffer = EventBuffer() if log else None
+    results = [play_one(split_seed(base_seed, i), num_players, max_turns, buffer) for i in range(start, stop)]
+    return results, buffer.data if log else None
+
+
+class SimStats:
+    def __init__(self, num_players=4):
+        self.num_players = num_players
+        self.games = 0
+        self.unfinished = 0
+        self.turns = 0
+        self.wins = [0] * num_players
+        self.cards_drawn = [0] * num_players
+        self.reshuffles = [0] * num_players
+
+    def add(self, result):
+        winner, turns, drawn, reshuffles = result
+        self.games += 1
+        self.turns += turns
+        if winner is None:
+            self.unfinished += 1
+        else:
+            self.wins[winner] += 1
+        for seat in range(self.num_players):
+            self.cards_drawn[seat] += drawn[seat]
+            self.reshuffles[seat] += reshuffles[seat]
+
+    def summary(self):
+        n = max(1, self.games)
+        return {
+            'games': self.games,
+            'unfinished': self.unfinished,
+            'avg_turns': self.turns / n,
+            'win_rate': [w / n for w in self.wins],
+            'avg_cards_drawn': [d / n for d in self.cards_drawn],
+            'avg_reshuffles': [r / n for r in self.reshuffles],
+        }
+
+    def report(self):
+        s = self.summary()
+        lines = [f"Games: {s['games']}  (unfinished: {s['unfinished']})",
+                 f"Avg game length: {s['avg_turns']:.1f} turns",
+                 'Seat  Win%    Drawn/game  Reshuffles/game']
+        for seat in range(self.num_players):
+            lines.append(f"{seat:<5} {s['win_rate'][seat]*100:6.2f}  {s['avg_cards_drawn'][seat]:10.2f}  "
+                         f"{s['avg_reshuffles'][seat]:15.3f}")
+        return '\n'.join(lines)
+
+
+def simulate(games, workers=None, seed=0, num_players=4, chunk_size=500, max_turns=5000, progress=None,
+             log=None):
+    # chia dải seed thành từng chunk; kết quả từng chunk được gộp ngay khi về.
+    # log: EventLog nhận bản ghi của mọi ván (thứ tự chunk theo lúc về)
+    workers = workers or os.cpu_count() or 1
+    stats = SimStats(num_players)
+    chunks = [(start, min(games, start + chunk_size)) for start in range(0, games, chunk_size)]
+
+    def collect(results, data):
+        for result in results:
+            stats.add(result)
+        if log is not None:
+            log.extend(data)
+        if progress:
+            progress(stats)
+
+    if workers <= 1:
+        for start, stop in chunks:
+            collect(*run_chunk(seed, start, stop, num_players, max_turns, log is not None))
+        return stats
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_chunk, seed, start, stop, num_players, max_turns, log is not None)
+                   for start, stop in chunks]
+        for fut in as_completed(futures):
+            collect(*fut.result())
+    return stats
+
+
+def simulate_batch(games, batch_size=4096, seed=0, num_players=4, max_turns=5000):
+    # chế độ mảng NumPy: mỗi lô batch_size ván chạy song song trong một process
+    from batch import BatchEngine
+    stats = SimStats(num_players)
+    for i, start in enumerate(range(0, games, batch_size)):
+        engine = BatchEngine(min(batch_size, games - start), num_players, seed=split_seed(seed, i))
+        engine.run(max_turns)
+        for result in engine.results():
+            stats.add(result)
+    return stats
+
+
+def main(args):
+    t0 = time.perf_counter()
+    if args.batch:
+        stats = simulate_batch(args.games, args.batch, seed=args.seed or 0, num_players=args.players)
+    elif args.log:
+        with EventLog(args.log) as log:
+            stats = simulate(args.games, workers=args.workers, seed=args.seed or 0,
+                             num_players=args.players, chunk_size=args.chunk, log=log)
+    else:
+        stats = simulate(args.games, workers=args.workers, seed=args.seed or 0,
+                         num_players=args.players, chunk_size=args.chunk)
+    elapsed = time.perf_counter() - t0
+    print(stats.report())
+    mode = f'batch {args.batch}' if args.batch else f'{args.workers or os.cpu_count()} workers'
+    print(f'Elapsed: {elapsed:.2f}s  ({stats.games / max(elapsed, 1e-9) * 60:.0f} games/min, {mode})')
@@ -0,0 +1,56 @@
+import tkinter as tk
+from collections import OrderedDict
+
+# lề trong suốt quanh lá để chứa viền highlight (vẽ lệch ra ngoài tới 4px)
+PAD = 5
+
+
+class SpriteAtlas:
+    # mỗi kiểu lá (mặt trước theo màu, mặt sau, trạng thái highlight) được vẽ một
+    # lần vào PhotoImage cho mỗi kích thước lá, sau đó mỗi lá chỉ còn là một item
+    # ảnh trên canvas. Chỉ giữ max_sizes kích thước dùng gần nhất (LRU).
+    def __init__(self, master, max_sizes=3):
+        self.master = master
+        self.max_sizes = max_sizes
+        self._sizes = OrderedDict()
+
+    def get(self, width, height, layers):
+        # layers: các lớp hình chữ nhật (inset, fill, outline, outline_width) vẽ từ dưới lên;
+        # inset âm là viền nằm ngoài mép lá
+        size = (int(width), int(height))
+        bucket = self._sizes.get(size)
+        if bucket is None:
+            bucket = self._sizes[size] = {}
+            while len(self._sizes) > self.max_sizes:
+                self._sizes.popitem(last=False)
+        else:
+            self._sizes.move_to_end(size)
+        img = bucket.get(layers)
+        if img is None:
+            img = bucket[layers] = self._render(size, layers)
+        return img
+
+    def _render(self, size, layers):
+        w, h = size
+        img = tk.PhotoImage(master=self.master, width=w + 2*PAD, height=h + 2*PAD)
+        for inset, fill, outline, outline_width in layers:
+            x0, y0 = PAD + inset, PAD + inset
+            x1, y1 = PAD + w - inset, PAD + h - inset
+            if outline:
+                # viền: tô cả khối rồi tô phần trong đè lên (hoặc để trong suốt)
+                for k in range(outline_width):
+                    self._frame(img, x0 + k, y0 + k, x1 - k, y1 - k, outline)
+                x0, y0 = x0 + outline_width, y0 + outline_width
+                x1, y1 = x1 - outline_width, y1 - outline_width
+            if fill and x1 > x0 and y1 > y0:
+                img.put(fill, to=(x0, y0, x1, y1))
+        return img
+
+    def _frame(self, img, x0, y0, x1, y1, color):
+        img.put(color, to=(x0, y0, x1, y0 + 1))
+        img.put(color, to=(x0, y1 - 1, x1, y1))
+        img.put(color, to=(x0, y0, x0 + 1, y1))
+        img.put(color, to=(x1 - 1, y0, x1, y1))
+
+    def sizes(self):
+        return list(self._sizes)
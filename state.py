@@ -0,0 +1,335 @@
+import random
+
+from game import (COLORS, KINDS, ALL_VALUES, NUM_STATES, NUM_CARDS, CARD_KIND, COLOR_INDEX, VALUE_INDEX, KIND_BITS,
+                  PLAYABLE_KINDS, Hand)
+
+# trạng thái ván dạng gọn cho tìm kiếm: mọi thứ là int/tuple bất biến nên copy
+# chỉ là gán lại vài slot, các tuple (bộ bài, tay bài) được dùng chung giữa các
+# trạng thái. Hash Zobrist được cập nhật dần theo từng thay đổi.
+NUM_KINDS = len(KINDS)
+MAX_SEATS = 10
+KIND_COLOR = [COLOR_INDEX[c] for c, _ in KINDS]
+KIND_VALUE = [VALUE_INDEX[v] for _, v in KINDS]
+KIND_WILD = [c is None for c, _ in KINDS]
+SKIP = VALUE_INDEX['Skip']
+REVERSE = VALUE_INDEX['Reverse']
+DRAW_TWO = VALUE_INDEX['Draw Two']
+DRAW_FOUR = VALUE_INDEX['Wild Draw Four']
+
+
+def _bits(kinds):
+    bits = 0
+    for kind in kinds:
+        bits += 1 << (KIND_BITS * kind)
+    return bits
+
+
+def _counts(bits):
+    # (kind, số lá) cho các loại có mặt trong bitset
+    kind = 0
+    while bits:
+        count = bits & 7
+        if count:
+            yield kind, count
+        bits >>= KIND_BITS
+        kind += 1
+
+
+def _keys(rng, *shape):
+    if len(shape) == 1:
+        return [rng.getrandbits(64) for _ in range(shape[0])]
+    return [_keys(rng, *shape[1:]) for _ in range(shape[0])]
+
+
+# khoá Zobrist cố định (seed cố định để hash giống nhau giữa các process)
+_rng = random.Random(0x2B0B)
+Z_HAND = _keys(_rng, MAX_SEATS, NUM_KINDS, 8)
+Z_DISCARD = _keys(_rng, NUM_KINDS, 8)
+# số lượng 0 có khoá 0: thêm/bớt loại lá chỉ XOR khoá của số lượng cũ và mới
+for _seat in Z_HAND:
+    for _row in _seat:
+        _row[0] = 0
+for _row in Z_DISCARD:
+    _row[0] = 0
+Z_TOP = _keys(_rng, NUM_STATES)
+Z_CURRENT = _keys(_rng, MAX_SEATS)
+Z_PENDING = _keys(_rng, MAX_SEATS)
+Z_DECK = _keys(_rng, NUM_CARDS + 1)
+Z_EPOCH = _keys(_rng, 64)
+Z_REVERSED = _rng.getrandbits(64)
+Z_WINNER = _keys(_rng, MAX_SEATS)
+del _rng
+
+
+class GameState:
+    # hands: tuple bitset Hand (3 bit đếm mỗi loại) theo ghế; deck: tuple loại lá,
+    # chỉ deck[:deck_len] còn trong bộ (rút ở cuối), nên rút bài không tạo tuple
+    # mới; discard: bitset số lá mỗi loại nằm dưới lá trên cùng; epoch: số lần
+    # trộn lại (mỗi lần trộn là một tuple deck mới)
+    __slots__ = ('hands', 'sizes', 'deck', 'deck_len', 'discard', 'top_kind', 'top_color', 'direction',
+                 'current', 'pending', 'winner', 'turns', 'epoch', 'hash')
+
+    @classmethod
+    def from_engine(cls, engine):
+        return cls.build([[CARD_KIND[c.id] for c in p.hand] for p in engine.players],
+                         [CARD_KIND[c.id] for c in engine.deck.cards],
+                         [CARD_KIND[c.id] for c in engine.discard_pile[:-1]],
+                         CARD_KIND[engine.top_card().id], COLOR_INDEX[engine.top_card().color],
+                         engine.direction, engine.current, engine.pending_uno_penalty_index, engine.turns)
+
+    @classmethod
+    def build(cls, hands, deck, discard, top_kind, top_color, direction=1, current=0, pending=None, turns=0):
+        # hands/deck/discard: danh sách loại lá; deck rút từ cuối như Deck.cards
+        state = object.__new__(cls)
+        state.hands = tuple(_bits(kinds) for kinds in hands)
+        state.sizes = tuple(len(kinds) for kinds in hands)
+        state.deck = tuple(deck)
+        state.deck_len = len(deck)
+        state.discard = _bits(discard)
+        state.top_kind = top_kind
+        state.top_color = top_color
+        state.direction = direction
+        state.current = current
+        state.pending = -1 if pending is None else pending
+        state.winner = -1
+        state.turns = turns
+        state.epoch = 0
+        state.hash = state.full_hash()
+        return state
+
+    @classmethod
+    def determinize(cls, snapshot, rng):
+        # một thế giới khả dĩ từ góc nhìn của snapshot (không dựng Card/Player): các
+        # lá chưa thấy được chia ngẫu nhiên cho đối thủ, phần còn lại là bộ bài
+        known = set(snapshot.hand)
+        known.update(snapshot.discard)
+        unknown = [CARD_KIND[cid] for cid in range(NUM_CARDS) if cid not in known]
+        rng.shuffle(unknown)
+        hands = []
+        pos = 0
+        for seat, size in enumerate(snapshot.hand_sizes):
+            if seat == snapshot.seat:
+                hands.append([CARD_KIND[cid] for cid in snapshot.hand])
+            else:
+                hands.append(unknown[pos:pos + size])
+                pos += size
+        top = snapshot.discard[-1]
+        return cls.build(hands, unknown[pos:], [CARD_KIND[cid] for cid in snapshot.discard[:-1]], CARD_KIND[top],
+                         snapshot.top_state // len(ALL_VALUES), snapshot.direction, snapshot.seat, None,
+                         snapshot.turns)
+
+    def full_hash(self):
+        # tính lại từ đầu (để kiểm tra bản cập nhật dần)
+        h = Z_TOP[self.top_state()] ^ Z_CURRENT[self.current] ^ Z_DECK[self.deck_len] ^ Z_EPOCH[self.epoch % 64]
+        if self.direction < 0:
+            h ^= Z_REVERSED
+        if self.pending >= 0:
+            h ^= Z_PENDING[self.pending]
+        if self.winner >= 0:
+            h ^= Z_WINNER[self.winner]
+        for seat, bits in enumerate(self.hands):
+            for kind, count in _counts(bits):
+                h ^= Z_HAND[seat][kind][count]
+        for kind, count in _counts(self.discard):
+            h ^= Z_DISCARD[kind][count]
+        return h
+
+    def copy(self):
+        state = object.__new__(GameState)
+        state.hands = self.hands
+        state.sizes = self.sizes
+        state.deck = self.deck
+        state.deck_len = self.deck_len
+        state.discard = self.discard
+        state.top_kind = self.top_kind
+        state.top_color = self.top_color
+        state.direction = self.direction
+        state.current = self.current
+        state.pending = self.pending
+        state.winner = self.winner
+        state.turns = self.turns
+        state.epoch = self.epoch
+        state.hash = self.hash
+        return state
+
+    def top_state(self):
+        return self.top_color * len(ALL_VALUES) + KIND_VALUE[self.top_kind]
+
+    def hand(self, seat):
+        return Hand(self.hands[seat], self.sizes[seat])
+
+    def legal_moves(self):
+        # các nước (kind, color) của người đang đi, wild tách theo 4 màu; không có lá
+        # đánh được thì chỉ có rút (None, None)
+        moves = []
+        for kind in self.hand(self.current).playable(self.top_state()):
+            if KIND_WILD[kind]:
+                moves.extend((kind, color) for color in COLORS)
+            else:
+                moves.append((kind, None))
+        return moves or [(None, None)]
+
+    def apply(self, move, rng):
+        # trạng thái mới sau nước (kind, color) của người hiện tại; self không đổi
+        kind, color = move
+        state = self.copy()
+        state._step(kind, None if color is None else COLOR_INDEX[color], rng)
+        return state
+
+    def rollout(self, rng, max_turns=400):
+        # đánh tiếp tới hết ván bằng bot đơn giản (lá hợp lệ có chỉ số loại nhỏ
+        # nhất, màu wild ngẫu nhiên); trả về ghế thắng hoặc -1. Không cần trạng
+        # thái trung gian nên chạy trên list/biến cục bộ, không tính hash
+        hands = list(self.hands)
+        sizes = list(self.sizes)
+        deck = list(self.deck[:self.deck_len])
+        discard = [kind for kind, count in _counts(self.discard) for _ in range(count)]
+        top_kind, top_color = self.top_kind, self.top_color
+        direction, current, n = self.direction, self.current, len(hands)
+        num_values, num_colors = len(ALL_VALUES), len(COLORS)
+
+        def draw(seat):
+            nonlocal deck, discard
+            if not deck:
+                deck, discard = discard, []
+                rng.shuffle(deck)
+                if not deck:
+                    return None
+            kind = deck.pop()
+            hands[seat] += 1 << (KIND_BITS * kind)
+            sizes[seat] += 1
+            return kind
+
+        if self.pending >= 0:
+            draw(self.pending)
+            draw(self.pending)
+        for _ in range(max_turns):
+            playable = PLAYABLE_KINDS[top_color * num_values + KIND_VALUE[top_kind]]
+            fields = hands[current] & playable
+            if fields:
+                kind = ((fields & -fields).bit_length() - 1) // KIND_BITS
+            else:
+                kind = draw(current)
+                if kind is None or not (playable >> (KIND_BITS * kind)) & 1:
+                    current = (current + direction) % n
+                    continue
+            seat = current
+            hands[seat] -= 1 << (KIND_BITS * kind)
+            sizes[seat] -= 1
+            discard.append(top_kind)
+            top_kind = kind
+            top_color = rng.randrange(num_colors) if KIND_WILD[kind] else KIND_COLOR[kind]
+            value = KIND_VALUE[kind]
+            if value == REVERSE:
+                direction = -direction
+            elif value == SKIP:
+                current = (current + direction) % n
+            elif value == DRAW_TWO or value == DRAW_FOUR:
+                current = (current + direction) % n
+                for _ in range(2 if value == DRAW_TWO else 4):
+                    draw(current)
+            if sizes[seat] == 0:
+                return seat
+            current = (current + direction) % n
+        return -1
+
+    # --- các bước dưới đây chỉ dùng trên bản copy riêng ---
+    def _add(self, seat, kind, delta=1):
+        bits = self.hands[seat]
+        shift = KIND_BITS * kind
+        count = (bits >> shift) & 7
+        self.hash ^= Z_HAND[seat][kind][count] ^ Z_HAND[seat][kind][count + delta]
+        hands = list(self.hands)
+        hands[seat] = bits + (delta << shift)
+        self.hands = tuple(hands)
+        sizes = list(self.sizes)
+        sizes[seat] += delta
+        self.sizes = tuple(sizes)
+
+    def _discard(self, kind):
+        count = (self.discard >> (KIND_BITS * kind)) & 7
+        self.hash ^= Z_DISCARD[kind][count] ^ Z_DISCARD[kind][count + 1]
+        self.discard += 1 << (KIND_BITS * kind)
+
+    def _set(self, name, value, keys):
+        old = getattr(self, name)
+        self.hash ^= keys[old] ^ keys[value]
+        setattr(self, name, value)
+
+    def _reshuffle(self, rng):
+        # chồng huỷ (trừ lá trên cùng) thành bộ bài mới
+        cards = []
+        for kind in range(NUM_KINDS):
+            count = (self.discard >> (KIND_BITS * kind)) & 7
+            if count:
+                self.hash ^= Z_DISCARD[kind][count]
+                cards.extend([kind] * count)
+        rng.shuffle(cards)
+        self.discard = 0
+        self.deck = tuple(cards)
+        self._set('deck_len', len(cards), Z_DECK)
+        self.hash ^= Z_EPOCH[self.epoch % 64] ^ Z_EPOCH[(self.epoch + 1) % 64]
+        self.epoch += 1
+
+    def _draw(self, seat, rng):
+        # rút 1 lá vào tay seat; trả về loại lá, None nếu hết bài
+        if self.deck_len == 0:
+            self._reshuffle(rng)
+            if self.deck_len == 0:
+                return None
+        kind = self.deck[self.deck_len - 1]
+        self._set('deck_len', self.deck_len - 1, Z_DECK)
+        self._add(seat, kind)
+        return kind
+
+    def _next(self, steps=1):
+        self._set('current', (self.current + self.direction * steps) % len(self.hands), Z_CURRENT)
+
+    def _step(self, kind, color, rng):
+        # color: chỉ số màu cho lá wild
+        seat = self.current
+        if self.pending >= 0:
+            # phạt quên hô UNO (chỉ có khi lấy từ engine có người chơi thật)
+            self.hash ^= Z_PENDING[self.pending]
+            for _ in range(2):
+                self._draw(self.pending, rng)
+            self.pending = -1
+        if kind is None:
+            # rút 1 lá, đánh luôn nếu được
+            kind = self._draw(seat, rng)
+            if kind is None or not (PLAYABLE_KINDS[self.top_state()] >> (KIND_BITS * kind)) & 1:
+                self._next()
+                self.turns += 1
+                return
+            if KIND_WILD[kind] and color is None:
+                color = rng.randrange(len(COLORS))
+        self._add(seat, kind, -1)
+        self._discard(self.top_kind)
+        self.hash ^= Z_TOP[self.top_state()]
+        self.top_kind = kind
+        self.top_color = color if KIND_WILD[kind] else KIND_COLOR[kind]
+        self.hash ^= Z_TOP[self.top_state()]
+        value = KIND_VALUE[kind]
+        if value == REVERSE:
+            self.direction = -self.direction
+            self.hash ^= Z_REVERSED
+        if value in (DRAW_TWO, DRAW_FOUR):
+            self._next()
+            for _ in range(2 if value == DRAW_TWO else 4):
+                self._draw(self.current, rng)
+        elif value == SKIP:
+            self._next()
+        if self.sizes[seat] == 0:
+            self.winner = seat
+            self.hash ^= Z_WINNER[seat]
+        self._next()
+        self.turns += 1
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        return (isinstance(other, GameState) and self.hash == other.hash and self.hands == other.hands and
+                self.discard == other.discard and self.top_kind == other.top_kind and
+                self.top_color == other.top_color and self.current == other.current and
+                self.direction == other.direction and self.deck[:self.deck_len] == other.deck[:other.deck_len])
@@ -0,0 +1,18 @@
+from game import GameEngine
+from bots import ISMCTSBot
+from tournament import make_policy
+
+
+def test_max_iterations_not_cut_by_think_ms():
+    # tournament.py so bot theo số vòng lặp: think_ms (mặc định 400) không được cắt ngang
+    engine = GameEngine(['A', 'B', 'C', 'D'], seed=7)
+    bot = ISMCTSBot('A', think_ms=1, seed=1, max_iterations=300)
+    bot.decide(engine.snapshot())
+    assert bot._tree.visits == 300
+
+
+def test_make_policy_iterations():
+    bot = make_policy('ismcts:50', 'A', 1)
+    assert bot.max_iterations == 50
+    bot.decide(GameEngine(['A', 'B', 'C', 'D'], seed=3).snapshot())
+    assert bot._tree.visits == 50
@@ -0,0 +1,187 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from game import GameEngine, Player, split_seed
+
+# so hai bot A và B: mỗi seed được chơi thành một cặp ván (duplicate deal),
+# ván đầu A ngồi ghế chẵn, B ghế lẻ; ván sau đổi chỗ với đúng bộ bài đó. Điểm
+# của cặp (0, 0.5, 1) ít nhiễu hơn hai ván độc lập vì may rủi của bộ bài bị
+# triệt tiêu. Kiểm định SPRT trên điểm cặp dừng ngay khi đủ ý nghĩa thống kê.
+MAX_TURNS = 5000
+# mức Elo của hai giả thuyết H0 / H1 và sai số loại I / II mặc định
+ELO0, ELO1 = 0.0, 20.0
+ALPHA = BETA = 0.05
+# không kết luận trước chừng này cặp; phương sai tối thiểu khi mọi cặp hoà
+# (hai bot giống hệt nhau cho điểm 0.5 ở mọi cặp)
+MIN_PAIRS = 20
+MIN_VARIANCE = 1e-3
+
+
+def make_policy(spec, name, seed):
+    # spec: 'simple' hoặc 'ismcts:<số vòng lặp>' (dùng số vòng lặp thay cho thời
+    # gian để kết quả không phụ thuộc tải của máy)
+    kind, _, arg = spec.partition(':')
+    if kind == 'simple':
+        return Player(name)
+    if kind == 'ismcts':
+        from bots import ISMCTSBot
+        return ISMCTSBot(name, seed=seed, max_iterations=int(arg or 200))
+    raise ValueError(f'unknown bot: {spec}')
+
+
+def play_game(seed, specs, num_players=4, max_turns=MAX_TURNS):
+    # specs: (spec ghế chẵn, spec ghế lẻ) -> điểm của bên ghế chẵn (0, 0.5 nếu quá lượt, 1)
+    seats = {}
+    for i in range(num_players):
+        name = f'Bot {i+1}'
+        seats[name] = make_policy(specs[i % 2], name, split_seed(seed, 2 + i))
+    engine = GameEngine(list(seats), seed=seed, bot=seats.__getitem__)
+    while engine.winner is None and engine.turns < max_turns:
+        engine.apply_move(*engine.players[engine.current].decide(engine.snapshot()))
+    for player in engine.players:
+        if hasattr(player, 'close'):
+            player.close()
+    if engine.winner is None:
+        return 0.5
+    return 1.0 if engine.winner % 2 == 0 else 0.0
+
+
+def play_pairs(base_seed, start, stop, a, b, num_players=4, max_turns=MAX_TURNS):
+    # chạy trong worker: cặp thứ i dùng split_seed(base_seed, i); trả về điểm của A mỗi cặp
+    scores = []
+    for i in range(start, stop):
+        seed = split_seed(base_seed, i)
+        first = play_game(seed, (a, b), num_players, max_turns)
+        second = 1.0 - play_game(seed, (b, a), num_players, max_turns)
+        scores.append((first + second) / 2)
+    return scores
+
+
+def expected_score(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def score_elo(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+class SPRT:
+    # GSPRT xấp xỉ chuẩn trên điểm từng cặp (như các framework test engine cờ):
+    # LLR ~ n * (s1 - s0) * (2 * mean - s0 - s1) / (2 * var)
+    def __init__(self, elo0=ELO0, elo1=ELO1, alpha=ALPHA, beta=BETA):
+        self.elo0, self.elo1 = elo0, elo1
+        self.s0, self.s1 = expected_score(elo0), expected_score(elo1)
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.n = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        # số cặp theo điểm: mỗi ván 0 / 0.5 / 1 nên điểm cặp là bội của 0.25
+        self.counts = {0.0: 0, 0.25: 0, 0.5: 0, 0.75: 0, 1.0: 0}
+
+    def add(self, score):
+        self.n += 1
+        self.total += score
+        self.total_sq += score * score
+        self.counts[score] = self.counts.get(score, 0) + 1
+
+    def mean(self):
+        return self.total / self.n if self.n else 0.5
+
+    def variance(self):
+        if self.n < 2:
+            return 0.0
+        mean = self.mean()
+        return max(0.0, self.total_sq / self.n - mean * mean)
+
+    def llr(self):
+        var = max(self.variance(), MIN_VARIANCE)
+        return self.n * (self.s1 - self.s0) * (2 * self.mean() - self.s0 - self.s1) / (2 * var)
+
+    def status(self):
+        # 'H1' (A mạnh hơn elo1), 'H0' (không hơn elo0) hoặc None (chưa đủ)
+        if self.n < MIN_PAIRS:
+            return None
+        llr = self.llr()
+        if llr >= self.upper:
+            return 'H1'
+        if llr <= self.lower:
+            return 'H0'
+        return None
+
+    def elo(self):
+        # Elo ước lượng của A so với B và khoảng tin cậy 95%
+        mean = self.mean()
+        margin = 1.96 * math.sqrt(self.variance() / max(1, self.n))
+        return score_elo(mean), score_elo(mean - margin), score_elo(mean + margin)
+
+    def report(self):
+        elo, low, high = self.elo()
+        pairs = ' '.join(f'{k:g}:{v}' for k, v in self.counts.items() if v)
+        return (f'pairs {self.n} ({2 * self.n} games)  score {self.mean():.3f}  '
+                f'Elo {elo:+.1f} [{low:+.1f}, {high:+.1f}]  '
+                f'LLR {self.llr():+.2f} ({self.lower:.2f}, {self.upper:.2f})  [{pairs}]')
+
+
+def run(a, b, max_pairs=10000, workers=None, seed=0, num_players=4, chunk_size=8, sprt=None, progress=None):
+    # lên lịch từng chunk cặp ván cho các worker, cập nhật SPRT mỗi khi một chunk
+    # về; chỉ giữ vài chunk đang chạy nên dừng sớm không phí nhiều ván
+    workers = workers or os.cpu_count() or 1
+    sprt = sprt or SPRT()
+    chunks = iter([(start, min(max_pairs, start + chunk_size)) for start in range(0, max_pairs, chunk_size)])
+
+    def collect(scores):
+        for score in scores:
+            sprt.add(score)
+        if progress:
+            progress(sprt)
+        return sprt.status() is not None
+
+    if workers <= 1:
+        for start, stop in chunks:
+            if collect(play_pairs(seed, start, stop, a, b, num_players)):
+                break
+        return sprt
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for start, stop in chunks:
+            pending.add(pool.submit(play_pairs, seed, start, stop, a, b, num_players))
+            if len(pending) < 2 * workers:
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if any([collect(fut.result()) for fut in done]):
+                break
+        else:
+            while pending and sprt.status() is None:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    collect(fut.result())
+        for fut in pending:
+            fut.cancel()
+    return sprt
+
+
+def main(args):
+    if args.players % 2:
+        raise SystemExit('tournament: --players phải là số chẵn (A và B ngồi xen kẽ)')
+    t0 = time.perf_counter()
+    last = [t0]
+
+    def progress(sprt):
+        now = time.perf_counter()
+        if now - last[0] >= 1.0 or sprt.status() is not None:
+            last[0] = now
+            print(sprt.report(), flush=True)
+
+    sprt = SPRT(args.elo0, args.elo1, args.alpha, args.beta)
+    run(args.a, args.b, max_pairs=args.max_pairs, workers=args.workers, seed=args.seed, num_players=args.players,
+        chunk_size=args.chunk, sprt=sprt, progress=progress)
+    elapsed = time.perf_counter() - t0
+    result = {'H1': f'{args.a} is stronger (Elo >= {args.elo1:g})',
+              'H0': f'{args.a} is not {args.elo1:g} Elo stronger (Elo <= {args.elo0:g} accepted)',
+              None: f'inconclusive after {sprt.n} pairs'}[sprt.status()]
+    print(sprt.report())
+    print(f'Result: {result}  ({elapsed:.1f}s)')
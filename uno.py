@@ -1,9 +1,131 @@
-from gui import UnoGUI
-import tkinter as tk
+import argparse
+
+from scheduler import INSTANT
+
+
+def parse_speed(value):
+    if value == 'instant':
+        return INSTANT
+    speed = float(value)
+    # thời gian chờ được chia cho speed
+    if not speed > 0:
+        raise argparse.ArgumentTypeError(f'speed phải > 0: {value}')
+    return speed
+
+
+def make_bot(args):
+    # hàm tạo bot từ tên cho GameEngine
+    if args.bot == 'ismcts':
+        from bots import ISMCTSBot
+        return lambda name: ISMCTSBot(name, think_ms=args.think_ms, workers=args.rollout_workers)
+    from game import Player
+    return Player
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='uno', description='UNO - Round Table')
+    parser.add_argument('--seed', type=int, default=None, help='seed để chơi lại đúng ván cũ')
+    parser.add_argument('--speed', type=parse_speed, default=1.0,
+                        help="hệ số tốc độ animation/lượt, hoặc 'instant'")
+    parser.add_argument('--demo', action='store_true', help='4 bot tự chơi với nhau')
+    parser.add_argument('--bot', choices=['simple', 'ismcts'], default='simple',
+                        help='simple: đánh lá hợp lệ đầu tiên; ismcts: tìm kiếm Monte-Carlo')
+    parser.add_argument('--think-ms', type=int, default=400, help='thời gian suy nghĩ mỗi nước của bot ismcts')
+    parser.add_argument('--rollout-workers', type=int, default=1, help='số process rollout của bot ismcts')
+    parser.add_argument('--log', default=None, metavar='PATH', help='ghi log sự kiện nhị phân của ván')
+    parser.add_argument('--perf', action='store_true', help='đo thời gian vẽ/xử lý sự kiện/bot (F3: overlay)')
+    parser.add_argument('--perf-out', default=None, metavar='JSON', help='ghi percentile ra JSON khi thoát (bật --perf)')
+    parser.add_argument('--connect', default=None, metavar='ADDR',
+                        help="chơi trên server.py: host:port hoặc unix:/đường/dẫn")
+    sub = parser.add_subparsers(dest='command')
+
+    sim = sub.add_parser('simulate', help='chạy nhiều ván bot không giao diện')
+    sim.add_argument('--games', type=int, default=10000)
+    sim.add_argument('--workers', type=int, default=None, help='mặc định: số core')
+    sim.add_argument('--players', type=int, default=4)
+    sim.add_argument('--chunk', type=int, default=500, help='số ván mỗi lần gửi về')
+    sim.add_argument('--seed', type=int, default=0)
+    sim.add_argument('--batch', type=int, default=0, metavar='B',
+                     help='chạy B ván song song bằng NumPy (cần numpy)')
+    sim.add_argument('--log', default=None, metavar='PATH', help='ghi log sự kiện của mọi ván (không dùng với --batch)')
+
+    tour = sub.add_parser('tournament', help='so hai bot bằng các cặp ván đổi chỗ, dừng sớm theo SPRT')
+    tour.add_argument('a', help="bot cần thử: 'simple' hoặc 'ismcts:<số vòng lặp>'")
+    tour.add_argument('b', nargs='?', default='simple', help='bot đối chứng (mặc định simple)')
+    tour.add_argument('--max-pairs', type=int, default=10000, help='dừng hẳn sau chừng này cặp ván')
+    tour.add_argument('--workers', type=int, default=None, help='mặc định: số core')
+    tour.add_argument('--players', type=int, default=4, help='số ghế (chẵn; A và B ngồi xen kẽ)')
+    tour.add_argument('--chunk', type=int, default=8, help='số cặp ván mỗi lần gửi về')
+    tour.add_argument('--seed', type=int, default=0)
+    tour.add_argument('--elo0', type=float, default=0.0, help='H0: A hơn B không quá elo0')
+    tour.add_argument('--elo1', type=float, default=20.0, help='H1: A hơn B ít nhất elo1')
+    tour.add_argument('--alpha', type=float, default=0.05)
+    tour.add_argument('--beta', type=float, default=0.05)
+
+    srv = sub.add_parser('server', help='chạy nhiều bàn trong một process asyncio')
+    srv.add_argument('--listen', default='127.0.0.1:7777', help="host:port ('' để tắt TCP)")
+    srv.add_argument('--unix', default=None, metavar='PATH', help='nghe thêm trên Unix socket')
+    srv.add_argument('--tables', type=int, default=0, help='số bàn toàn bot chạy liên tục (tải giả lập)')
+    srv.add_argument('--workers', type=int, default=2, help='số process cho bot ismcts')
+    srv.add_argument('--stats', action='store_true', help='in lượt/s, CPU và bộ nhớ mỗi 5 giây')
+
+    rep = sub.add_parser('replay', help='phát lại một ván từ log sự kiện')
+    rep.add_argument('path')
+    rep.add_argument('--game', type=int, default=0, help='thứ tự ván trong file log')
+    return parser
 
 
 if __name__ == '__main__':
-    names = ['You', 'Clam', 'Hiếu Nguyễn ', 'Tank']
-    root = tk.Tk()
-    app = UnoGUI(root, names)
-    root.mainloop()
\ No newline at end of file
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.command == 'simulate':
+        if args.log and args.batch:
+            parser.error('--log không dùng được với --batch')
+        import simulate
+        simulate.main(args)
+    elif args.command == 'tournament':
+        import tournament
+        tournament.main(args)
+    elif args.command == 'server':
+        import server
+        server.main(args, make_bot(args))
+    else:
+        if args.log and args.seed is not None and not 0 <= args.seed < 2**64:
+            parser.error('--log cần --seed trong khoảng 0..2^64-1 (seed được ghi vào log)')
+        # chỉ cần Tk khi chơi có giao diện
+        from gui import UnoGUI
+        import tkinter as tk
+        import perf
+        names = ['You', 'Clam', 'Hiếu Nguyễn ', 'Tank']
+        if args.command == 'replay':
+            from eventlog import EventReader, replay
+            reader = EventReader(args.path)
+            game = reader.game(args.game)
+            # bàn của GUI vẽ đúng 4 ghế
+            if game.players != len(names):
+                parser.error(f'replay: ván có {game.players} người chơi, giao diện chỉ hiển thị {len(names)}'
+                             f' (xem bằng: python eventlog.py {args.path} --game {args.game})')
+        recorder = perf.Recorder(args.perf_out) if args.perf or args.perf_out else perf.from_env()
+        root = tk.Tk()
+        if args.command == 'replay':
+            app = UnoGUI(root, names, speed=args.speed, demo=True, perf=recorder)
+            app.play_back(replay(reader, game, names[:game.players]))
+            root.mainloop()
+        elif args.connect:
+            from client import TableClient
+            remote = TableClient(args.connect, names[0])
+            app = UnoGUI(root, names, speed=args.speed, perf=recorder, remote=remote)
+            root.mainloop()
+            remote.close()
+        else:
+            log = None
+            if args.log:
+                from eventlog import EventLog
+                log = EventLog(args.log)
+            app = UnoGUI(root, names, seed=args.seed, speed=args.speed, demo=args.demo, bot=make_bot(args), log=log,
+                         perf=recorder)
+            root.mainloop()
+            if log is not None:
+                log.close()
+        if recorder is not None:
+            recorder.close()